@@ -6,13 +6,210 @@ in the string that are 'C' or 'G'.
 
 __author__ = 'Anthony Torres for CS 12P, altorresmoran@jeff.cis.cabrillo.edu'
 
+import argparse
+import collections
+import mmap
+import os
 import sys
-dna = sys.stdin.read()
-acgt_ls = [dna.count('A'), dna.count('C'), dna.count('G'), dna.count('T')]
-gc_ls = [dna.count('C'), dna.count('G')]
-acgt_total = sum(acgt_ls)
-cg_total = sum(gc_ls)
-if acgt_total == 0:
-  print(0.000)
-else:
-  print((cg_total / acgt_total) * 100)
+from concurrent.futures import ProcessPoolExecutor
+
+BASES = (b'A', b'C', b'G', b'T')
+BASE_INDEX = {ord(base): i for i, base in enumerate(BASES)}
+CHUNK_SIZE = 1 << 20
+
+
+def count_bases(data):
+  """
+  Returns a list of the [A, C, G, T] counts in a bytes-like chunk of DNA.
+  Each count is a C-level bulk scan over a chunk small enough to stay in cache.
+  """
+  return [data.count(base) for base in BASES]
+
+
+def count_stream(stream, chunk_size=CHUNK_SIZE):
+  """
+  Tallies A/C/G/T from a binary file object one fixed-size chunk at a time,
+  so memory use stays constant no matter how large the input is.
+  """
+  totals = [0, 0, 0, 0]
+  chunk = stream.read(chunk_size)
+  while chunk:
+    for i, count in enumerate(count_bases(chunk)):
+      totals[i] += count
+    chunk = stream.read(chunk_size)
+  return totals
+
+
+def count_file(path, chunk_size=CHUNK_SIZE):
+  """
+  Tallies A/C/G/T in the file at the given path by memory-mapping it and
+  scanning it chunk by chunk.
+  """
+  totals = [0, 0, 0, 0]
+  with open(path, 'rb') as file:
+    try:
+      mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+      # empty files cannot be mapped
+      return totals
+    with mapped:
+      for offset in range(0, len(mapped), chunk_size):
+        for i, count in enumerate(count_bases(mapped[offset:offset + chunk_size])):
+          totals[i] += count
+  return totals
+
+
+def count_range(path, start, stop, chunk_size=CHUNK_SIZE):
+  """
+  Tallies A/C/G/T in bytes [start, stop) of the file at the given path, mapping only that slice.
+  Meant to run in a worker process, so it opens its own file handle and mapping.
+  """
+  totals = [0, 0, 0, 0]
+  if start >= stop:
+    return totals
+  # mmap offsets must be aligned to the allocation granularity
+  offset = start - start % mmap.ALLOCATIONGRANULARITY
+  with open(path, 'rb') as file:
+    with mmap.mmap(file.fileno(), stop - offset, access=mmap.ACCESS_READ,
+                   offset=offset) as mapped:
+      for position in range(start - offset, stop - offset, chunk_size):
+        chunk = mapped[position:min(position + chunk_size, stop - offset)]
+        for i, count in enumerate(count_bases(chunk)):
+          totals[i] += count
+  return totals
+
+
+def count_file_parallel(path, workers=None):
+  """
+  Tallies A/C/G/T in the file at the given path by splitting it into one byte range per worker,
+  counting each range in a separate process and merging the results.
+  Single symbols never straddle a boundary, so the ranges need no overlap.
+  """
+  workers = workers or os.cpu_count() or 1
+  size = os.path.getsize(path)
+  if workers == 1 or size < workers * CHUNK_SIZE:
+    return count_file(path)
+  bounds = [size * i // workers for i in range(workers + 1)]
+  totals = [0, 0, 0, 0]
+  with ProcessPoolExecutor(max_workers=workers) as executor:
+    for counts in executor.map(count_range, [path] * workers, bounds[:-1], bounds[1:]):
+      for i, count in enumerate(counts):
+        totals[i] += count
+  return totals
+
+
+def gc_content(counts):
+  """ Returns the GC percentage for a list of [A, C, G, T] counts. """
+  acgt_total = sum(counts)
+  if acgt_total == 0:
+    return 0.000
+  return ((counts[1] + counts[2]) / acgt_total) * 100
+
+
+def fasta_lines(stream):
+  """
+  Streams a binary FASTA file object, yielding (header, None) at the start of each record and
+  (header, line) for each of its sequence lines. Sequence found before any header line is
+  attributed to a record with an empty header.
+  """
+  header = None
+  for line in stream:
+    line = line.strip()
+    if line.startswith(b'>'):
+      header = line[1:].decode(errors='replace')
+      yield header, None
+    elif line:
+      if header is None:
+        header = ''
+        yield header, None
+      yield header, line
+
+
+def record_gc(stream):
+  """ Yields (header, GC percentage) for each record of a binary FASTA file object. """
+  header, counts = None, None
+  for record, line in fasta_lines(stream):
+    if line is None:
+      if counts is not None:
+        yield header, gc_content(counts)
+      header, counts = record, [0, 0, 0, 0]
+    else:
+      for i, count in enumerate(count_bases(line)):
+        counts[i] += count
+  if counts is not None:
+    yield header, gc_content(counts)
+
+
+def window_gc(stream, window, step=None):
+  """
+  Yields (header, start, end, GC percentage) for every `window`-symbol window of each record of a
+  binary FASTA file object, advancing `step` symbols at a time (`window` if unspecified).
+  Windows never span records. Counts are kept as a running tally, updated by one symbol entering
+  and one leaving, so the whole profile costs O(n) regardless of window size.
+  """
+  step = step or window
+  symbols = collections.deque()
+  counts = [0, 0, 0, 0]
+  position = 0
+  for header, line in fasta_lines(stream):
+    if line is None:
+      symbols.clear()
+      counts = [0, 0, 0, 0]
+      position = 0
+      continue
+    for symbol in line:
+      symbols.append(symbol)
+      if symbol in BASE_INDEX:
+        counts[BASE_INDEX[symbol]] += 1
+      if len(symbols) > window:
+        leaving = symbols.popleft()
+        if leaving in BASE_INDEX:
+          counts[BASE_INDEX[leaving]] -= 1
+      position += 1
+      start = position - window
+      if start >= 0 and start % step == 0:
+        yield header, start, position, gc_content(counts)
+
+
+def main():
+  """
+  Prints the GC-content of the DNA on stdin, or in the file named by the optional argument.
+  With --fasta, prints one tab-separated line per record instead, and with --window, one line per
+  window of each record.
+  """
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument('path', nargs='?', help='DNA file to read instead of stdin')
+  parser.add_argument('--fasta', action='store_true', help='report GC-content per FASTA record')
+  parser.add_argument('--window', type=int, help='report GC-content per window of this size')
+  parser.add_argument('--step', type=int, help='distance between windows (default: window size)')
+  parser.add_argument('--workers', type=int,
+                      help='processes to count a file with (default 1, 0: one per CPU)')
+  args = parser.parse_args()
+  if (args.window is not None and args.window < 1) or (args.step is not None and args.step < 1):
+    parser.error('window and step must be positive')
+  if args.workers is not None:
+    if args.workers < 0:
+      parser.error('workers must not be negative')
+    if not args.path or args.fasta or args.window is not None:
+      parser.error('workers only apply to counting a whole file named by path')
+
+  if not args.fasta and args.window is None:
+    if args.path:
+      workers = 1 if args.workers is None else args.workers
+      print(gc_content(count_file_parallel(args.path, workers)))
+    else:
+      print(gc_content(count_stream(sys.stdin.buffer)))
+    return
+
+  stream = open(args.path, 'rb') if args.path else sys.stdin.buffer
+  with stream:
+    if args.window is not None:
+      for header, start, end, gc in window_gc(stream, args.window, args.step):
+        print(f'{header}\t{start}\t{end}\t{gc}')
+    else:
+      for header, gc in record_gc(stream):
+        print(f'{header}\t{gc}')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmarks GC-content counting throughput for the original read-everything-and-count approach
+against as01's chunked and multiprocess counters.
+Usage: bench_as01.py [megabytes]
+"""
+
+__author__ = 'Anthony Torres for CS 12P, altorresmoran@jeff.cis.cabrillo.edu'
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import as01
+
+
+def original(path):
+  """ The original as01 approach: read the whole input, then six passes of str.count(). """
+  with open(path) as file:
+    dna = file.read()
+  acgt_total = sum([dna.count('A'), dna.count('C'), dna.count('G'), dna.count('T')])
+  cg_total = sum([dna.count('C'), dna.count('G')])
+  return cg_total / acgt_total * 100 if acgt_total else 0.000
+
+
+def timed(label, size, function, *args):
+  start = time.perf_counter()
+  result = function(*args)
+  elapsed = time.perf_counter() - start
+  print(f'{label:<24}{elapsed:8.3f} s{size / elapsed / 2 ** 20:10.1f} MiB/s  {result:.6f}')
+
+
+def main():
+  megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+  with tempfile.NamedTemporaryFile(suffix='.dna', delete=False) as file:
+    line = ''.join(random.choices('ACGT', k=79)).encode() + b'\n'
+    for _ in range(megabytes * 2 ** 20 // len(line)):
+      file.write(line if random.random() < 0.5 else line[::-1])
+    path = file.name
+  try:
+    size = os.path.getsize(path)
+    timed('original dna.count', size, original, path)
+    timed('chunked stream', size, lambda: as01.gc_content(as01.count_stream(open(path, 'rb'))))
+    timed('mmap', size, lambda: as01.gc_content(as01.count_file(path)))
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+      timed(f'{workers} worker(s)', size,
+            lambda: as01.gc_content(as01.count_file_parallel(path, workers)))
+      workers *= 2
+  finally:
+    os.remove(path)
+
+
+if __name__ == '__main__':
+  main()
@@ -6,67 +6,272 @@ See: https://en.wikipedia.org/wiki/Readability#Popular_readability_formulas
 
 __author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
 
+import json
+import os
+import sys
 import unicodedata
 import re
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from math import sqrt
+from typing import NamedTuple
+
+
+_LETTERS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+# bytes.translate() deletion tables: every byte outside the whitelist
+_WORD_DELETE = bytes(c for c in range(256) if chr(c) not in _LETTERS + ' \n')
+_SENTENCE_DELETE = bytes(c for c in range(256) if chr(c) not in _LETTERS + ' \n.?!')
+_TERMINATORS = b'.?!'
+# a letter followed by a terminator, plus the rest of its token so each token matches at most once
+_SENTENCE_END = re.compile(rb'[a-zA-Z][.!?][^ \n]*')
+_VOWEL_GROUP = re.compile(r'[aeiouy]+')
+# how much of a corpus file is checked for NUL bytes to tell whether it is binary
+_BINARY_PROBE = 8192
+
+
+def _ascii(text):
+  """ Returns the accent-stripped ASCII bytes of the given text. """
+  if text.isascii():
+    return text.encode('ascii')
+  return unicodedata.normalize('NFD', text).encode('ascii', 'ignore')
 
 
 def strip_accents(text):
-  text = unicodedata.normalize('NFD', text)
-  text = text.encode('ascii', 'ignore')
-  text = text.decode('utf-8')
-  return str(text)
+  if text.isascii():
+    return text
+  return _ascii(text).decode('ascii')
 
 
 def word(string):
-  whitelist = set('abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ\n')
-  return ''.join(filter(whitelist.__contains__, string))
+  return string.encode('ascii', 'ignore').translate(None, _WORD_DELETE).decode('ascii')
+
+
+class TextStats(NamedTuple):
+  """ Counts gathered from a text in one pass, from which any readability score can be computed. """
+  characters: int
+  words: int
+  sentences: int
+  syllables: int
+  complex_words: int
+
+
+@lru_cache(maxsize=65536)
+def syllable_count(word: str) -> int:
+  """
+  Estimates the number of syllables in a word of English letters by counting vowel groups,
+  discounting a silent final 'e'. Every word has at least one syllable.
+  """
+  word = word.lower()
+  count = len(_VOWEL_GROUP.findall(word))
+  if count > 1 and word.endswith('e') and not word.endswith(('le', 'ee')):
+    count -= 1
+  return max(count, 1)
+
+
+def analyze(text: str) -> TextStats:
+  """
+  Scans the given text once and returns its character, word, sentence, syllable and complex-word
+  (three or more syllables) counts.
+  Words and characters are counted from the sentence text with its terminators removed, which
+  is equivalent to filtering the original text whenever strip_accents() leaves it unchanged.
+  """
+  sentence_text = _ascii(text).translate(None, _SENTENCE_DELETE)
+  sentences = sum(1 for _ in _SENTENCE_END.finditer(sentence_text))
+  if text.isascii():
+    letters = sentence_text.translate(None, _TERMINATORS).split()
+  else:
+    # accented letters are dropped from words, not decomposed as they are for sentences
+    letters = text.encode('ascii', 'ignore').translate(None, _WORD_DELETE).split()
+  syllables = complex_words = 0
+  # syllables are counted once per distinct word rather than once per occurrence
+  for token, occurrences in Counter(letters).items():
+    count = syllable_count(token.decode('ascii'))
+    syllables += count * occurrences
+    if count >= 3:
+      complex_words += occurrences
+  return TextStats(sum(map(len, letters)), len(letters), sentences, syllables, complex_words)
+
+
+def _stats(text: str | TextStats) -> TextStats | None:
+  """ Returns statistics for text or passes them through, or None if no score is defined. """
+  stats = text if isinstance(text, TextStats) else analyze(text)
+  if stats.sentences == 0 or stats.words == 0:
+    return None
+  return stats
 
 
 def character_count(string):
-  char_count = 0
-  for character in ''.join(word(string).split()):
-    char_count += len(character)
-  return char_count
+  return analyze(string).characters
 
 
 # function for word count
 def word_count(string):
-  w_count = 0
-  for _ in word(string).split():
-    w_count += 1
-  return w_count
+  return analyze(string).words
 
 
 def sentence_count(string):
-  sen_count = 0
-  whitelist = set('abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ .?! \n')
-  string = ''.join(filter(whitelist.__contains__, strip_accents(string)))
-  words = string.split()
-  for letter in words:
-    match = re.search(r'[a-zA-Z]([.!?])', letter)
-    if match:
-      sen_count += 1
-  return sen_count
+  return analyze(string).sentences
 
 
-def automated_readability_index(text: str):
+def automated_readability_index(text: str | TextStats):
   """
-  Return the ARI score for the given text.
+  Return the ARI score for the given text, or for statistics already gathered by analyze().
   See: https://en.wikipedia.org/wiki/Automated_readability_index
   """
-  if sentence_count(text) == 0:
+  stats = _stats(text)
+  if stats is None:
     return None
   else:
-    ari = (4.71 * (character_count(text) / word_count(text))) + \
-          (0.5 * (word_count(text) / sentence_count(text)) - 21.43)
+    ari = (4.71 * (stats.characters / stats.words)) + \
+          (0.5 * (stats.words / stats.sentences) - 21.43)
     return ari
 
 
+def flesch_reading_ease(text: str | TextStats):
+  """
+  Return the Flesch reading-ease score for the given text or statistics.
+  See: https://en.wikipedia.org/wiki/Flesch%E2%80%93Kincaid_readability_tests
+  """
+  stats = _stats(text)
+  if stats is None:
+    return None
+  return 206.835 - 1.015 * (stats.words / stats.sentences) - 84.6 * (stats.syllables / stats.words)
+
+
+def flesch_kincaid_grade(text: str | TextStats):
+  """
+  Return the Flesch-Kincaid grade level for the given text or statistics.
+  See: https://en.wikipedia.org/wiki/Flesch%E2%80%93Kincaid_readability_tests
+  """
+  stats = _stats(text)
+  if stats is None:
+    return None
+  return 0.39 * (stats.words / stats.sentences) + 11.8 * (stats.syllables / stats.words) - 15.59
+
+
+def gunning_fog_index(text: str | TextStats):
+  """
+  Return the Gunning fog index for the given text or statistics.
+  See: https://en.wikipedia.org/wiki/Gunning_fog_index
+  """
+  stats = _stats(text)
+  if stats is None:
+    return None
+  return 0.4 * ((stats.words / stats.sentences) + 100 * (stats.complex_words / stats.words))
+
+
+def smog_grade(text: str | TextStats):
+  """
+  Return the SMOG grade for the given text or statistics.
+  See: https://en.wikipedia.org/wiki/SMOG
+  """
+  stats = _stats(text)
+  if stats is None:
+    return None
+  return 1.0430 * sqrt(stats.complex_words * (30 / stats.sentences)) + 3.1291
+
+
+def coleman_liau_index(text: str | TextStats):
+  """
+  Return the Coleman-Liau index for the given text or statistics.
+  See: https://en.wikipedia.org/wiki/Coleman%E2%80%93Liau_index
+  """
+  stats = _stats(text)
+  if stats is None:
+    return None
+  letters_per_100 = stats.characters / stats.words * 100
+  sentences_per_100 = stats.sentences / stats.words * 100
+  return 0.0588 * letters_per_100 - 0.296 * sentences_per_100 - 15.8
+
+
+READABILITY_TESTS = {
+  'ari': automated_readability_index,
+  'flesch': flesch_reading_ease,
+  'flesch_kincaid': flesch_kincaid_grade,
+  'gunning_fog': gunning_fog_index,
+  'smog': smog_grade,
+  'coleman_liau': coleman_liau_index,
+}
+
+
+def readability_scores(text: str | TextStats) -> dict[str, float | None]:
+  """ Returns every score in READABILITY_TESTS, all computed from a single analyze() pass. """
+  stats = text if isinstance(text, TextStats) else analyze(text)
+  return {name: test(stats) for name, test in READABILITY_TESTS.items()}
+
+
+def corpus_documents(source: str):
+  """
+  Yields (id, text) pairs for a corpus: every text file under a directory (in sorted path order,
+  ids being the paths), or each line of a JSONL file ('-' for stdin) holding an object with a
+  "text" field and an optional "id" field (the line number if absent).
+  Hidden files and directories, __pycache__ directories and binary files (those with a NUL byte
+  in their first _BINARY_PROBE bytes) under a directory are skipped.
+  """
+  if os.path.isdir(source):
+    for root, dirs, files in os.walk(source):
+      dirs[:] = sorted(name for name in dirs
+                       if not name.startswith('.') and name != '__pycache__')
+      for name in sorted(files):
+        if name.startswith('.'):
+          continue
+        path = os.path.join(root, name)
+        with open(path, 'rb') as file:
+          data = file.read()
+        if b'\0' not in data[:_BINARY_PROBE]:
+          yield path, data.decode('utf-8', errors='replace')
+  else:
+    stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    with stream:
+      for line_number, line in enumerate(stream, 1):
+        if line.strip():
+          document = json.loads(line)
+          yield document.get('id', line_number), document['text']
+
+
+def _score_document(document):
+  """ Scores one (id, text) pair in a worker process, returning a JSON line. """
+  document_id, text = document
+  return json.dumps({'id': document_id, **readability_scores(text)})
+
+
+def score_corpus(documents, workers: int = None, max_in_flight: int = None):
+  """
+  Scores (id, text) pairs in a process pool, yielding one JSON line per document in input order.
+  At most `max_in_flight` documents (four per worker if unspecified) are submitted but not yet
+  yielded at any moment, so memory use stays flat however long the corpus is.
+  """
+  workers = workers or os.cpu_count() or 1
+  max_in_flight = max_in_flight or 4 * workers
+  pending = deque()
+  with ProcessPoolExecutor(max_workers=workers) as executor:
+    for document in documents:
+      if len(pending) >= max_in_flight:
+        yield pending.popleft().result()
+      pending.append(executor.submit(_score_document, document))
+    while pending:
+      yield pending.popleft().result()
+
+
 if __name__ == '__main__':
-  import sys
-  line = sys.stdin.read()
-  if sentence_count(line) == 0:
+  import argparse
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument('--corpus', metavar='SOURCE',
+                      help='score every file in a directory, or every document in a JSONL file '
+                           "('-' for stdin), writing one JSON line of scores per document")
+  parser.add_argument('--workers', type=int, help='processes to score with (default: one per CPU)')
+  parser.add_argument('--max-in-flight', type=int,
+                      help='documents scored but not yet written, at most')
+  args = parser.parse_args()
+  if args.corpus:
+    for result in score_corpus(corpus_documents(args.corpus), args.workers, args.max_in_flight):
+      print(result)
+    sys.exit()
+
+  stats = analyze(sys.stdin.read())
+  if stats.sentences == 0:
     print('0.000')
   else:
     # ari
-    print(automated_readability_index(line))
+    print(automated_readability_index(stats))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Checks as02's single-pass analyzer against the original multi-scan implementation on a generated
+regression corpus, times both on a long document, then reports the per-megabyte cost of the
+original and current normalisation functions on ASCII-only and accent-heavy text.
+Usage: bench_as02.py [kilobytes]
+"""
+
+__author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
+
+import random
+import re
+import sys
+import time
+import timeit
+import unicodedata
+
+import as02
+
+SAMPLES = [
+  '', 'Hello.', 'Hello world', 'é.', 'Café au lait! Naïve résumé? Yes.', 'a\tb. c\rd!',
+  '... ?!', 'Mr. Smith went to Washington. He said "hi!" 42 times.', 'über-cool, ñandú.\n\nEnd',
+]
+ALPHABET = ('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZéüñÅçœ0123456789'
+            ' \n\t.,;:?!"\'-')
+
+
+def original_strip_accents(text):
+  text = unicodedata.normalize('NFD', text)
+  text = text.encode('ascii', 'ignore')
+  text = text.decode('utf-8')
+  return str(text)
+
+
+def original_word(string):
+  whitelist = set('abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ\n')
+  return ''.join(filter(whitelist.__contains__, string))
+
+
+def original_sentence_text(string):
+  whitelist = set('abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ .?! \n')
+  return ''.join(filter(whitelist.__contains__, original_strip_accents(string)))
+
+
+def current_sentence_text(string):
+  return as02.strip_accents(string).encode('ascii').translate(None, as02._SENTENCE_DELETE)
+
+
+def original_ari(text):
+  """ The original as02 implementation, re-filtering the text for every count. """
+  def character_count(string):
+    return sum(len(character) for character in ''.join(original_word(string).split()))
+
+  def word_count(string):
+    return len(original_word(string).split())
+
+  def sentence_count(string):
+    string = original_sentence_text(string)
+    return sum(1 for letter in string.split() if re.search(r'[a-zA-Z]([.!?])', letter))
+
+  if sentence_count(text) == 0:
+    return None
+  if word_count(text) == 0:
+    return None
+  return (4.71 * (character_count(text) / word_count(text))) + \
+         (0.5 * (word_count(text) / sentence_count(text)) - 21.43)
+
+
+def corpus(count=2000, seed=20):
+  rng = random.Random(seed)
+  yield from SAMPLES
+  for _ in range(count):
+    yield ''.join(rng.choices(ALPHABET, k=rng.randrange(200)))
+
+
+def main():
+  kilobytes = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+  mismatches = [text for text in corpus()
+                if original_ari(text) != as02.automated_readability_index(text)]
+  print(f'{len(mismatches)} mismatches on regression corpus')
+  for text in mismatches[:5]:
+    print(repr(text))
+
+  sentence = 'The quick brown fox jumps over the lazy dog. Où est la café? '
+  document = sentence * (kilobytes * 1024 // len(sentence))
+  for label, function in (('original', original_ari),
+                          ('single pass', as02.automated_readability_index)):
+    start = time.perf_counter()
+    function(document)
+    print(f'{label:<14}{time.perf_counter() - start:8.3f} s')
+
+  microbenchmark()
+
+
+def microbenchmark(megabytes=4, repeat=5):
+  """ Prints the best-of-`repeat` cost in milliseconds per MB of each normalisation function. """
+  inputs = {
+    'ascii': 'The quick brown fox jumps over the lazy dog. 42 times, really?! ',
+    'accents': 'Où est le café? Ñandú über alles. Crème brûlée, s\'il vous plaît! ',
+  }
+  functions = {
+    'strip_accents': (original_strip_accents, as02.strip_accents),
+    'word': (original_word, as02.word),
+    'sentence filter': (original_sentence_text, current_sentence_text),
+  }
+  print(f'{"ms/MB":<26}{"original":>10}{"current":>10}')
+  for input_name, sample in inputs.items():
+    text = sample * (megabytes * 2 ** 20 // len(sample.encode()))
+    for name, (original, current) in functions.items():
+      costs = [min(timeit.repeat(lambda: function(text), number=1, repeat=repeat))
+               * 1000 / megabytes for function in (original, current)]
+      print(f'{name + " (" + input_name + ")":<26}{costs[0]:10.2f}{costs[1]:10.2f}')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmarks serial against map-reduce n-gram counting with increasing numbers of worker processes
+on a generated corpus, checking that every run produces the same counts (as does feeding the
+counter one line at a time, so many batches hold fewer than max_len words), then measures the recall
+and memory of approximate_most_frequent_n_grams() against most_frequent_n_grams(), failing if recall
+drops below RECALL_THRESHOLD for any length whose top counts clear the sketch's error bound.
+Usage: bench_n_grams.py [lines] [max n-gram length]
+"""
+
+__author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
+
+import inspect
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import n_grams
+
+RECALL_THRESHOLD = 0.9
+
+
+def corpus(line_count, seed=20):
+  rng = random.Random(seed)
+  vocabulary = [f'word{i}' for i in range(5000)] + ['the', 'a', 'of', 'and', '"quoted,', '--']
+  weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+  return [' '.join(rng.choices(vocabulary, weights, k=rng.randrange(20)))
+          for _ in range(line_count)]
+
+
+def main():
+  line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+  max_len = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+  lines = corpus(line_count)
+
+  start = time.perf_counter()
+  serial = n_grams.NGramCounter(1, max_len)
+  serial.update(n_grams.tokens(lines))
+  baseline = time.perf_counter() - start
+  print(f'{"serial":<14}{baseline:8.3f} s')
+
+  incremental = n_grams.NGramCounter(1, max_len)
+  for line in lines:
+    incremental.update(n_grams.tokens([line]))
+  status = 'ok' if incremental.counts == serial.counts else 'MISMATCH'
+  print(f'{"line by line":<14}{status:>10}')
+
+  workers = 1
+  while workers <= (os.cpu_count() or 1):
+    start = time.perf_counter()
+    parallel = n_grams.NGramCounter(1, max_len)
+    parallel.update_parallel(lines, workers)
+    elapsed = time.perf_counter() - start
+    status = 'ok' if parallel.counts == serial.counts else 'MISMATCH'
+    print(f'{f"{workers} worker(s)":<14}{elapsed:8.3f} s{baseline / elapsed:7.2f}x  {status}')
+    workers *= 2
+
+  recall(lines[:line_count // 4], max_len)
+
+
+def recall(lines, max_len, limit=20):
+  """
+  Prints the share of exact top-`limit` n-grams per length found by the approximate mode with its
+  default parameters, asserting that it is at least RECALL_THRESHOLD for each length whose
+  `limit`-th exact count exceeds the most the sketch may overestimate by. Below that bound the
+  top n-grams are indistinguishable from noise, so their recall is only reported.
+  """
+  text = '\n'.join(lines)
+  epsilon = inspect.signature(n_grams.approximate_most_frequent_n_grams).parameters['epsilon']
+  bound = epsilon.default * sum(1 for _ in n_grams.tokens(lines))
+  results = {}
+  for label, function in (('exact', n_grams.most_frequent_n_grams),
+                          ('approximate', n_grams.approximate_most_frequent_n_grams)):
+    tracemalloc.start()
+    start = time.perf_counter()
+    results[label] = function(text, 1, max_len, limit)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'{label:<14}{elapsed:8.3f} s{peak / 2 ** 20:9.1f} MiB peak')
+  for n, exact in results['exact'].items():
+    found = {n_gram for n_gram, _ in results['approximate'].get(n, [])}
+    hits = sum(1 for n_gram, _ in exact if n_gram in found)
+    checked = exact[-1][1] > bound
+    print(f'{n}-gram top-{limit} recall: {hits / len(exact):.2f}'
+          f'{"" if checked else " (below the error bound, not checked)"}')
+    if checked:
+      assert hits / len(exact) >= RECALL_THRESHOLD, \
+          f'{n}-gram recall {hits / len(exact):.2f} is below {RECALL_THRESHOLD}'
+
+
+if __name__ == '__main__':
+  main()
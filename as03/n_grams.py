@@ -7,32 +7,229 @@ characters, with the following characters stripped from either end: !"#%&'()*,-.
 """
 __author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
 
+import heapq
+import itertools
+import math
+import os
+import pickle
 import sys
-from collections import defaultdict, Counter
+from array import array
+from collections import defaultdict, deque, Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator
+
+STRIP_CHARS = "!\"#%&'()*,-./:;?@\\_¡§¶·¿"
+BATCH_SIZE = 65536
+SHARD_LINES = 20000
+
+
+def tokens(lines: Iterable[str]) -> Iterator[str]:
+  """ Lazily yields the words of an iterable of lines of text (e.g. a file or sys.stdin). """
+  for line in lines:
+    for word in line.split():
+      # Strip characters from either end
+      word = word.lower().strip(STRIP_CHARS)
+      if word:
+        yield word
 
 
 def token(text):
-  strip_chars = set("!\"#%&'()*,-./:;?@\\_¡§¶·¿")
-  words = text.split()
-  processed_words = []
-  for word in words:
-    # Strip characters from either end
-    word = word.lower().strip()
-    while word and word[0] in strip_chars:
-      word = word[1:]
-    while word and word[-1] in strip_chars:
-      word = word[:-1]
-    # Append result to list
-    if word:
-      processed_words.append(word)
-  return processed_words
+  return list(tokens([text]))
 
 
 def find_ngrams(text, n):
   return zip(*[text[i:] for i in range(n)])
 
 
-def n_grams(text: str, n_gram_len: int, min_count: int = 2) -> dict[int, list[tuple[str]]]:
+def intern_tokens(words: Iterable[str]) -> tuple[list[str], array]:
+  """
+  Maps each distinct word to an integer ID in order of first appearance, returning the vocabulary
+  (IDs to words) and the words as a compact array of IDs. The words may be a lazy iterable such as
+  tokens(), so that only the distinct words are ever held as strings.
+  """
+  ids = {}
+  token_ids = array('I', (ids.setdefault(word, len(ids)) for word in words))
+  return list(ids), token_ids
+
+
+def packed_n_gram_counts(token_ids: array, bits: int, min_len: int, max_len: int):
+  """
+  Yields (n, Counter) for each n-gram length from `min_len` to `max_len`, where each n-gram is a
+  single integer packing its `bits`-bit token IDs, first word in the most significant bits.
+  Each length's keys are derived from the previous length's, so no token slices or tuples are
+  created and only two lengths' keys are held at once.
+  """
+  keys = token_ids
+  for n in range(1, max_len + 1):
+    if n > 1:
+      following = itertools.islice(token_ids, n - 1, None)
+      packed = ((key << bits) | token for key, token in zip(keys, following))
+      keys = array('Q', packed) if n * bits <= 64 else list(packed)
+    if n >= min_len:
+      yield n, Counter(keys)
+
+
+def unpack_n_gram(key: int, n: int, bits: int, vocabulary: list[str]) -> tuple[str]:
+  """ Returns the tuple of words packed into an integer by packed_n_gram_counts(). """
+  mask = (1 << bits) - 1
+  return tuple(vocabulary[(key >> (bits * (n - 1 - i))) & mask] for i in range(n))
+
+
+def count_n_grams(words: Iterable[str], min_len: int, max_len: int, min_count: int = 1,
+                  interned: bool = False) -> dict[int, Counter]:
+  """
+  Counts every n-gram of each length from `min_len` to `max_len` in an already-tokenized list of
+  words, returning a dictionary mapping each length to a Counter of its n-grams occurring at least
+  `min_count` times.
+  If `interned` is true, n-grams are counted as packed integers of interned token IDs, and tuples
+  of strings are only built for those that reach `min_count`, which uses far less memory on large
+  texts. The words may then be any iterable, consumed once, such as tokens(); otherwise they must
+  be a list.
+  """
+  if not interned:
+    result = {n: Counter(find_ngrams(words, n)) for n in range(min_len, max_len + 1)}
+    if min_count > 1:
+      result = {n: Counter({n_gram: count for n_gram, count in counts.items()
+                            if count >= min_count})
+                for n, counts in result.items()}
+    return result
+
+  vocabulary, token_ids = intern_tokens(words)
+  bits = max(1, (len(vocabulary) - 1).bit_length())
+  return {n: Counter({unpack_n_gram(key, n, bits, vocabulary): count
+                      for key, count in counts.items() if count >= min_count})
+          for n, counts in packed_n_gram_counts(token_ids, bits, min_len, max_len)}
+
+
+class NGramCounter:
+  """
+  Incrementally counts n-grams of lengths `min_len` through `max_len` over a stream of words fed
+  in any number of batches. The last max_len - 1 words are carried between batches, so n-grams
+  spanning a batch boundary are counted exactly once.
+  """
+
+  def __init__(self, min_len: int = 1, max_len: int = 1):
+    self.min_len = min_len
+    self.max_len = max_len
+    self.counts = {n: Counter() for n in range(min_len, max_len + 1)}
+    self.tail = []
+
+  def update(self, words: Iterable[str]):
+    """ Counts the n-grams completed by each of the given words, in batches of BATCH_SIZE. """
+    words = iter(words)
+    batch = list(itertools.islice(words, BATCH_SIZE))
+    while batch:
+      words_so_far = self.tail + batch
+      for n, counts in self.counts.items():
+        # only n-grams ending in the new batch; earlier ones were counted by a previous update
+        start = max(0, len(self.tail) - n + 1)
+        counts.update(find_ngrams(words_so_far[start:], n))
+      self.tail = words_so_far[-(self.max_len - 1):] if self.max_len > 1 else []
+      batch = list(itertools.islice(words, BATCH_SIZE))
+
+  def update_parallel(self, lines: Iterable[str], workers: int = None,
+                      shard_lines: int = SHARD_LINES):
+    """
+    Counts the n-grams of an iterable of lines as update(tokens(lines)) would, but map-reduce
+    style: the lines are split into shards of `shard_lines` lines, each shard is counted in a
+    worker process and the per-shard counts are merged into this counter.
+    Words never span lines, so each shard is seeded with the last max_len - 1 words preceding it,
+    found by tokenizing backward from the end of the previous shard. Each shard then counts only
+    the n-grams ending within it, so none are lost or counted twice at a boundary.
+    At most two shards per worker are in flight at once.
+    """
+    workers = workers or os.cpu_count() or 1
+    lines = iter(lines)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+      shard = list(itertools.islice(lines, shard_lines))
+      while shard:
+        if len(pending) >= 2 * workers:
+          self._merge_counts(pending.popleft().result())
+        pending.append(executor.submit(_count_shard, shard, self.tail, self.min_len, self.max_len))
+        self.tail = _shard_tail(shard, self.tail, self.max_len - 1)
+        shard = list(itertools.islice(lines, shard_lines))
+      while pending:
+        self._merge_counts(pending.popleft().result())
+
+  def _merge_counts(self, counts: dict[int, Counter]):
+    for n, n_gram_counts in counts.items():
+      if n in self.counts:
+        self.counts[n].update(n_gram_counts)
+
+  def merge(self, other: 'NGramCounter'):
+    """
+    Adds another counter's counts to this one's, e.g. to combine counts from independent streams.
+    N-grams spanning the end of one stream and the start of the other are not counted.
+    """
+    self._merge_counts(other.counts)
+
+  def save(self, path: str):
+    """
+    Checkpoints this counter to a file, so counting can resume later with load().
+    Only plain data is pickled, never the class itself, so a checkpoint written by the script can
+    be loaded by code importing this module and vice versa.
+    """
+    state = {'min_len': self.min_len, 'max_len': self.max_len, 'tail': self.tail,
+             'counts': {n: dict(counts) for n, counts in self.counts.items()}}
+    with open(path, 'wb') as file:
+      pickle.dump(state, file, pickle.HIGHEST_PROTOCOL)
+
+  @classmethod
+  def load(cls, path: str) -> 'NGramCounter':
+    """ Returns a counter restored from a checkpoint written by save(). """
+    with open(path, 'rb') as file:
+      state = pickle.load(file)
+    counter = cls(state['min_len'], state['max_len'])
+    counter.tail = state['tail']
+    counter.counts = {n: Counter(counts) for n, counts in state['counts'].items()}
+    return counter
+
+
+def _count_shard(lines: list[str], tail: list[str], min_len: int,
+                 max_len: int) -> dict[int, Counter]:
+  """ Counts the n-grams ending within one shard of lines, in a worker process. """
+  counter = NGramCounter(min_len, max_len)
+  counter.tail = tail
+  counter.update(tokens(lines))
+  return counter.counts
+
+
+def _shard_tail(lines: list[str], tail: list[str], size: int) -> list[str]:
+  """
+  Returns the last `size` words of `tail` followed by the words of `lines`, tokenizing only as
+  many lines from the end as are needed.
+  """
+  if size <= 0:
+    return []
+  words = []
+  for line in reversed(lines):
+    words[:0] = token(line)
+    if len(words) >= size:
+      return words[-size:]
+  return (tail + words)[-size:]
+
+
+def group_n_grams(n_gram_counts: Counter) -> dict[int, list[tuple[str]]]:
+  """
+  Groups counted n-grams by their count, as a dictionary mapping each count to the list of
+  n-grams occurring that many times in ascending lexicographic/alphabetical order.
+  """
+  # sort the n-grams lexicographically
+  filtered_n_grams = sorted(n_gram_counts.items(), key=lambda x: x[0])
+
+  # group the filtered n-grams by their count
+  grouped_n_grams = defaultdict(list)
+  for n_gram, count in filtered_n_grams:
+    grouped_n_grams[count].append(n_gram)
+
+  # sort the grouped n-grams by their count and return the result
+  return {count: sorted(n_gram_tuple, key=lambda x: x) for count, n_gram_tuple in
+          grouped_n_grams.items()}
+
+
+def n_grams(text: str, n_gram_len: int, min_count: int = 2,
+            interned: bool = False) -> dict[int, list[tuple[str]]]:
   """
   Finds and returns all word n-grams of length `n_gram_len`
   occurring at least `min_count` times in `text`.
@@ -40,34 +237,38 @@ def n_grams(text: str, n_gram_len: int, min_count: int = 2) -> dict[int, list[tu
   :param text: the text to analyze
   :param n_gram_len: the desired length of n-grams (e.g. 2 for 2-grams)
   :param min_count: the minimum number of times an n-gram must appear in the text to be counted
+  :param interned: whether to count n-grams as packed integer token IDs (see count_n_grams())
   :return a dictionary mapping n-gram occurrence counts to a list of the n-grams occurring that
           number of times, as a list of n_gram_len-tuples of strings in ascending
           lexicographic/alphabetical order of the n-gram words.
   """
-  words = token(text)
+  # interned counting consumes the words lazily, never holding a string per token
+  words = tokens([text]) if interned else token(text)
 
-  # loop over all possible n-grams of the given length and update their counts
-  n_gram_counts = Counter(find_ngrams(words, n_gram_len))
+  # count all n-grams of the given length occurring at least min_count times
+  n_gram_counts = count_n_grams(words, n_gram_len, n_gram_len, min_count, interned)[n_gram_len]
 
-  # filter the n-grams based on the minimum count and sort them lexicographically
-  filtered_n_grams = sorted(
-    [(n_gram, count) for n_gram, count in n_gram_counts.items() if count >= min_count],
-    key=lambda x: x[0])
+  return group_n_grams(n_gram_counts)
 
-  # group the filtered n-grams by their count
-  grouped_n_grams = defaultdict(list)
-  for n_gram, count in filtered_n_grams:
-    grouped_n_grams[count].append(n_gram)
 
-  # sort the grouped n-grams by their count and return the result
-  return {count: sorted(n_gram_tuple, key=lambda x: x) for count, n_gram_tuple in
-          grouped_n_grams.items()}
+def parallel_n_grams(lines: Iterable[str], n_gram_len: int, min_count: int = 2,
+                     workers: int = None) -> dict[int, list[tuple[str]]]:
+  """
+  Returns the same result as n_grams() for the text of an iterable of lines, counted map-reduce
+  style across `workers` processes (one per CPU if unspecified).
+  """
+  counter = NGramCounter(n_gram_len, n_gram_len)
+  counter.update_parallel(lines, workers)
+  counts = counter.counts[n_gram_len]
+  return group_n_grams(Counter({n_gram: count for n_gram, count in counts.items()
+                                if count >= min_count}))
 
 
 def most_frequent_n_grams(text: str,
                           min_len: int = 1,
                           max_len: int = 10,
-                          limit: int = 5) -> dict[int, list[tuple[tuple[str], int]]]:
+                          limit: int = 5,
+                          interned: bool = False) -> dict[int, list[tuple[tuple[str], int]]]:
   """
   Returns a dictionary mapping n-gram lengths to a list of the most frequently occurring word
   n-grams of that length, along with their occurrence counts, for n-grams appearing at least twice.
@@ -76,33 +277,106 @@ def most_frequent_n_grams(text: str,
   :param min_len: the minimum n-gram length
   :param max_len: the maximum n-gram length
   :param limit: the maximum number of n-grams to display for each length
+  :param interned: whether to count n-grams as packed integer token IDs (see count_n_grams())
   :return a dictionary mapping n-gram lengths to a list of the most frequently occurring n-grams
           of that length, along with their occurrence counts, as a list of 2-tuples, where
           each tuple contains a tuple of the words in an n-gram and the n-gram's occurrence count.
           The list shall be sorted in descending order of occurrence count, with ties broken in
           ascending lexicographic/alphabetical order of the n-gram words.
   """
-  # create dictionary
-  n_grams_counts = defaultdict(Counter)
-  # loop over n-gram lengths
-  for n in range(min_len, max_len + 1):
-    n_gram_dict = n_grams(text, n)
-    for count, n_gram_list in n_gram_dict.items():
-      for n_gram in n_gram_list:
-        n_grams_counts[n][n_gram] += count
+  # tokenize once and count every length from the same words, lazily if interned
+  words = tokens([text]) if interned else token(text)
+  n_grams_counts = count_n_grams(words, min_len, max_len, 2, interned)
   # dictionary for final output
   result = {}
   # loop over n-gram lengths
   for n, n_gram_count in n_grams_counts.items():
-    # filter out n-grams with count < 2
-    n_gram_count = {k: v for k, v in n_gram_count.items() if v >= 2}
-    # sort the n-grams by count (descending) and then lexicographically (ascending)
-    sorted_n_grams = sorted(n_gram_count.items(), key=lambda x: (-x[1], x[0]))
-    # take only the top `limit` n-grams
-    top_n_grams = sorted_n_grams[:limit]
-    # store the top n-grams in the final result dictionary
-    result[n] = [(tuple(n_gram), count) for n_gram, count in top_n_grams]
+    # n-grams with count < 2 are already filtered out; key so that the smallest are most frequent
+    candidates = [(-count, n_gram) for n_gram, count in n_gram_count.items()]
+    if candidates:
+      # select only the top `limit` n-grams by count (descending) then lexicographically (ascending)
+      result[n] = [(n_gram, -count) for count, n_gram in heapq.nsmallest(limit, candidates)]
+
+  return result
+
+
+class HeavyHitters:
+  """
+  Approximately tracks the most frequent items of a stream in bounded memory: a Count-Min sketch
+  estimates every item's count, overestimating by at most `epsilon` times the number of items
+  added with probability at least 1 - `delta`, and a candidate table of at most 2 * `capacity`
+  items keeps the highest estimates seen so far.
+  """
 
+  def __init__(self, epsilon: float = 1e-4, delta: float = 0.01, capacity: int = 1000):
+    self.width = math.ceil(math.e / epsilon)
+    self.depth = math.ceil(math.log(1 / delta))
+    self.rows = [array('Q', bytes(8 * self.width)) for _ in range(self.depth)]
+    self.capacity = capacity
+    self.candidates = {}
+    # lowest estimate kept by the last pruning of the candidate table
+    self._floor = 0
+
+  def add(self, item) -> int:
+    """ Counts one occurrence of an item and returns its estimated count. """
+    # Kirsch-Mitzenmacher double hashing derives every row's index from one hash
+    h = hash(item) & 0xFFFFFFFFFFFFFFFF
+    h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+    estimate = None
+    for i, row in enumerate(self.rows):
+      index = (h1 + i * h2) % self.width
+      row[index] += 1
+      if estimate is None or row[index] < estimate:
+        estimate = row[index]
+    candidates = self.candidates
+    if item in candidates or len(candidates) < 2 * self.capacity or estimate > self._floor:
+      candidates[item] = estimate
+    if len(candidates) >= 2 * self.capacity:
+      # prune back to the best half, so the table stays bounded at amortized O(1) per item
+      kept = heapq.nlargest(self.capacity, candidates.items(), key=lambda x: x[1])
+      self.candidates = dict(kept)
+      self._floor = kept[-1][1]
+    return estimate
+
+  def most_common(self, limit: int, min_count: int = 1) -> list[tuple[object, int]]:
+    """
+    Returns up to `limit` (item, estimated count) pairs with estimates of at least `min_count`,
+    in descending order of estimate with ties broken in ascending order of item.
+    """
+    return heapq.nsmallest(limit, ((item, count) for item, count in self.candidates.items()
+                                   if count >= min_count), key=lambda x: (-x[1], x[0]))
+
+
+def approximate_most_frequent_n_grams(text: str,
+                                      min_len: int = 1,
+                                      max_len: int = 10,
+                                      limit: int = 5,
+                                      epsilon: float = 1e-4,
+                                      delta: float = 0.01,
+                                      capacity: int = None
+                                      ) -> dict[int, list[tuple[tuple[str], int]]]:
+  """
+  Returns the same shape of result as most_frequent_n_grams(), but estimated in bounded memory by
+  one HeavyHitters sketch per n-gram length rather than counted exactly.
+  Counts may be overestimated by up to `epsilon` times the number of words, with probability at
+  least 1 - `delta` per n-gram, and `capacity` (100 times `limit` if unspecified) candidate
+  n-grams per length are retained; raising it improves recall at the cost of memory.
+
+  :param text: the text (or an iterable of lines of text) to analyze
+  """
+  capacity = capacity or 100 * max(limit, 1)
+  trackers = {n: HeavyHitters(epsilon, delta, capacity) for n in range(min_len, max_len + 1)}
+  window = deque(maxlen=max_len)
+  for word in tokens([text] if isinstance(text, str) else text):
+    window.append(word)
+    n_gram = tuple(window)
+    for n in range(min_len, len(n_gram) + 1):
+      trackers[n].add(n_gram[-n:])
+  result = {}
+  for n, tracker in trackers.items():
+    top_n_grams = tracker.most_common(limit, 2)
+    if top_n_grams:
+      result[n] = top_n_grams
   return result
 
 
@@ -111,27 +385,58 @@ def main():
   Expects one or two command-line arguments:
   sys.argv[1]: A length of n-gram (e.g. 2 for bigrams)
   sys.argv[2] (optional): A minimum occurrence count (2 if unspecified)
-  Then prints, in descending order of occurrence count, lines containing (a) the occurrence count
-  and (b) a comma-separated list of all n-grams with that occurrence count,
+  plus an optional --workers=N argument to count shards of stdin in N processes, and an
+  optional --checkpoint=PATH argument naming a file from which to resume counting (if it
+  exists) and to which the updated counts are saved, so that growing input such as rolling logs
+  need only be fed the lines added since the last run.
+  Then streams stdin and prints, in descending order of occurrence count, lines containing (a) the
+  occurrence count and (b) a comma-separated list of all n-grams with that occurrence count,
   in ascending alphabetical/lexicographic order.
   """
-  if len(sys.argv) < 2 or len(sys.argv) > 3:
+  checkpoint = None
+  workers = None
+  args = sys.argv[:]
+  for arg in sys.argv[1:]:
+    if arg.startswith('--checkpoint='):
+      checkpoint = arg[len('--checkpoint='):]
+      args.remove(arg)
+    elif arg.startswith('--workers='):
+      workers = arg[len('--workers='):]
+      args.remove(arg)
+
+  if len(args) < 2 or len(args) > 3:
     print('why are you wasting electricity?')
     return
 
   try:
-    n_gram_len = int(sys.argv[1])
-    if len(sys.argv) == 3:
-      min_count = int(sys.argv[2])
+    n_gram_len = int(args[1])
+    if len(args) == 3:
+      min_count = int(args[2])
     else:
       min_count = 2
+    if workers is not None:
+      workers = int(workers)
   except ValueError:
     print('NUMBERS ONLY!!!')
     return
 
-  text = ' '.join(sys.stdin.readlines())
+  if checkpoint and os.path.exists(checkpoint):
+    counter = NGramCounter.load(checkpoint)
+    if n_gram_len not in counter.counts:
+      print(f'checkpoint does not count {n_gram_len}-grams')
+      return
+  else:
+    counter = NGramCounter(n_gram_len, n_gram_len)
+  if workers is None:
+    counter.update(tokens(sys.stdin))
+  else:
+    counter.update_parallel(sys.stdin, workers)
+  if checkpoint:
+    counter.save(checkpoint)
 
-  n_grams_dict = n_grams(text, n_gram_len, min_count)
+  n_grams_dict = group_n_grams(Counter({n_gram: count
+                                        for n_gram, count in counter.counts[n_gram_len].items()
+                                        if count >= min_count}))
 
   for count in sorted(n_grams_dict.keys(), reverse=True):
     n_grams_list = n_grams_dict[count]
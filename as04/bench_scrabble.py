@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Compares the memory and speed of a DAWG of the Scrabble® word list against a plain set of
+strings, for membership tests, pattern queries and rack queries, then compares the original
+per-character scoring of words in a large text against the precomputed score table.
+Usage: bench_scrabble.py [word list path] [megabytes of text]
+"""
+
+__author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
+
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import scrabble
+from dawg import Dawg
+
+
+def timed(label, function, repeat=1):
+  start = time.perf_counter()
+  for _ in range(repeat):
+    result = function()
+  print(f'{label:<36}{(time.perf_counter() - start) / repeat * 1000:10.3f} ms')
+  return result
+
+
+def main():
+  path = sys.argv[1] if len(sys.argv) > 1 else scrabble.WORDS_PATH
+  with open(path) as file:
+    text = file.read()
+
+  tracemalloc.start()
+  words = frozenset(text.split())
+  set_bytes = tracemalloc.get_traced_memory()[0]
+  tracemalloc.stop()
+  start = time.perf_counter()
+  dawg = Dawg(words)
+  build = time.perf_counter() - start
+  dawg_bytes = sum(sys.getsizeof(part)
+                   for part in (dawg.starts, dawg.targets, dawg.final, dawg.labels))
+  print(f'{len(words)} words, {len(dawg)} DAWG nodes, built in {build:.2f} s')
+  print(f'{"set of strings":<36}{set_bytes / 2 ** 20:10.2f} MiB')
+  print(f'{"DAWG arrays":<36}{dawg_bytes / 2 ** 20:10.2f} MiB')
+
+  sample = random.Random(15).sample(sorted(words), min(10000, len(words)))
+  timed('10k lookups, set', lambda: sum(word in words for word in sample))
+  timed('10k lookups, DAWG', lambda: sum(word in dawg for word in sample))
+
+  pattern, tiles = '?A??ER', 'STBLE?R'
+  regex = re.compile(pattern.replace('?', '.') + '$')
+  timed(f'{pattern} any letters, set scan', lambda: {w for w in words if regex.match(w)})
+  timed(f'{pattern} any letters, DAWG', lambda: dawg.match(pattern))
+  timed(f'{pattern} from {tiles}, DAWG', lambda: dawg.match(pattern, tiles))
+
+  timed('anagram index build', lambda: scrabble.dictionary.anagrams)
+  timed('unary signature counts build', scrabble.dictionary._signature_unaries)
+  for rack in 'RETAINS', 'AEINRSTLDGBCMPF', 'AEINRST?', 'AEINRSTLODCUP??', 'AEEINRSTTLODCU?':
+    timed(f'rack {rack}, anagram index', lambda: scrabble.dictionary.rack_words(rack))
+    timed(f'rack {rack}, DAWG', lambda: dawg.rack_words(rack))
+
+  scoring(words, int(sys.argv[2]) if len(sys.argv) > 2 else 20)
+
+
+def original_word_score(word, words, letter_values):
+  """ The original word_score(), re-checking legality and parsing a value for every letter. """
+  tot_score = 0
+  for c in word:
+    if word in words:
+      tot_score += int(letter_values[c])
+    else:
+      return 0
+  return tot_score
+
+
+def original_highest_value_word(tokens, words, letter_values):
+  max_score = 0
+  max_word = None
+  for word in tokens:
+    if word in words:
+      high_score = original_word_score(word, words, letter_values)
+      if high_score > max_score:
+        max_score = high_score
+        max_word = word
+  return max_word
+
+
+def scoring(words, megabytes):
+  """ Times scoring every word of a generated text of the given size, both ways. """
+  letter_values = {letter: str(value)
+                   for letter, value in scrabble.dictionary.letter_values.items()}
+  rng = random.Random(16)
+  vocabulary = rng.sample(sorted(words), min(5000, len(words))) + ['the', 'Qwxz', 'and', '42']
+  with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+    while file.tell() < megabytes * 2 ** 20:
+      file.write(' '.join(rng.choices(vocabulary, k=1000)) + '.\n')
+    path = file.name
+  try:
+    with open(path) as file:
+      tokens = list(scrabble.tokenize_words(file))
+    print(f'{len(tokens)} tokens in {megabytes} MiB of text')
+    timed('score table built', lambda: scrabble.dictionary.scores)
+    timed('total points, original', lambda: sum(
+      original_word_score(word, words, letter_values) for word in tokens))
+    timed('total points, score table', lambda: sum(map(scrabble.word_score, tokens)))
+    timed('highest_value_word, original', lambda: original_highest_value_word(
+      tokens, words, letter_values))
+    timed('highest_value_word, score table', lambda: scrabble.highest_value_word(tokens))
+  finally:
+    os.remove(path)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+A directed acyclic word graph (DAWG) for Scrabble® move generation: a trie whose identical
+subtrees are merged, stored as flat arrays, and searched depth-first with pruning on the tiles in a
+rack and on a board pattern.
+"""
+__author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
+
+from array import array
+from collections import Counter
+from typing import Iterable
+
+BLANK = '?'
+
+
+class _Node:
+  """ A mutable node used only while building a Dawg. """
+  __slots__ = ('final', 'edges')
+
+  def __init__(self):
+    self.final = False
+    self.edges = {}
+
+  def key(self):
+    # children are already minimized, so identical subtrees are identical objects
+    return self.final, tuple((letter, id(child)) for letter, child in self.edges.items())
+
+
+class Dawg:
+  """
+  A minimal acyclic automaton recognizing a set of words. Node n's outgoing edges are
+  positions starts[n] through starts[n + 1] - 1 of the parallel `labels` string and `targets`
+  array, sorted by label, and final[n] is 1 if a word ends at node n.
+  """
+
+  def __init__(self, words: Iterable[str]):
+    """ Builds the DAWG with Daciuk et al.'s incremental algorithm for sorted input. """
+    root = _Node()
+    register = {}
+    unchecked = []  # (parent, letter, child) along the most recently added word
+    previous = ''
+
+    def minimize(down_to):
+      while len(unchecked) > down_to:
+        parent, letter, child = unchecked.pop()
+        parent.edges[letter] = register.setdefault(child.key(), child)
+
+    for word in sorted(set(words)):
+      common = 0
+      for a, b in zip(word, previous):
+        if a != b:
+          break
+        common += 1
+      minimize(common)
+      node = unchecked[-1][2] if unchecked else root
+      for letter in word[common:]:
+        child = _Node()
+        node.edges[letter] = child
+        unchecked.append((node, letter, child))
+        node = child
+      node.final = True
+      previous = word
+    minimize(0)
+    self._flatten(root)
+
+  def _flatten(self, root: _Node):
+    """ Numbers the nodes breadth-first and packs their edges into flat arrays. """
+    numbers = {id(root): 0}
+    order = [root]
+    for node in order:
+      for child in node.edges.values():
+        if id(child) not in numbers:
+          numbers[id(child)] = len(order)
+          order.append(child)
+    self.starts = array('I', [0])
+    self.targets = array('I')
+    self.final = bytearray(len(order))
+    labels = []
+    for number, node in enumerate(order):
+      self.final[number] = node.final
+      for letter in sorted(node.edges):
+        labels.append(letter)
+        self.targets.append(numbers[id(node.edges[letter])])
+      self.starts.append(len(labels))
+    self.labels = ''.join(labels)
+
+  def __len__(self) -> int:
+    """ Returns the number of nodes. """
+    return len(self.final)
+
+  def _child(self, node: int, letter: str) -> int:
+    """ Returns the node reached from `node` by `letter`, or -1. """
+    position = self.labels.find(letter, self.starts[node], self.starts[node + 1])
+    return self.targets[position] if position >= 0 else -1
+
+  def __contains__(self, word: str) -> bool:
+    node = 0
+    for letter in word:
+      node = self._child(node, letter)
+      if node < 0:
+        return False
+    return bool(self.final[node])
+
+  def rack_words(self, tiles: str) -> set[str]:
+    """ Returns the words that can be formed from some of the tiles, BLANKs being wild. """
+    return self._generate(tiles, None)
+
+  def match(self, pattern: str, tiles: str = None) -> set[str]:
+    """
+    Returns the words matching a pattern of letters already on the board and BLANK squares,
+    e.g. '?A??ER'. If `tiles` are given, the squares must be filled from them (BLANKs among them
+    being wild); otherwise any letter may fill a square.
+    """
+    return self._generate(tiles, pattern)
+
+  def hooks(self, letter: str, tiles: str) -> set[str]:
+    """
+    Returns the words that can be played through a single `letter` on the board using at least
+    one of the tiles. Any word formed from the tiles plus that letter which contains it can place
+    one occurrence of the letter on the board.
+    """
+    return {word for word in self._generate(tiles + letter, None)
+            if letter in word and len(word) > 1}
+
+  def _generate(self, tiles: str | None, pattern: str | None) -> set[str]:
+    """
+    Depth-first generation of the words spellable from `tiles` (unlimited if None) that match
+    `pattern` (any length if None), pruning every branch no remaining tile or square can extend.
+    """
+    labels, targets, starts, final = self.labels, self.targets, self.starts, self.final
+    rack = None if tiles is None else Counter(tiles.replace(BLANK, ''))
+    blanks = 0 if tiles is None else tiles.count(BLANK)
+    results = set()
+
+    def visit(node, prefix, blanks):
+      depth = len(prefix)
+      if pattern is None:
+        if final[node] and depth:
+          results.add(prefix)
+      elif depth == len(pattern):
+        if final[node]:
+          results.add(prefix)
+        return
+      square = BLANK if pattern is None else pattern[depth]
+      if square != BLANK:
+        child = self._child(node, square)
+        if child >= 0:
+          visit(child, prefix + square, blanks)
+        return
+      for edge in range(starts[node], starts[node + 1]):
+        letter = labels[edge]
+        if rack is None:
+          visit(targets[edge], prefix + letter, blanks)
+        elif rack[letter]:
+          # a real tile always does at least as well as a blank, so a blank is never tried instead
+          rack[letter] -= 1
+          visit(targets[edge], prefix + letter, blanks)
+          rack[letter] += 1
+        elif blanks:
+          visit(targets[edge], prefix + letter, blanks - 1)
+
+    visit(0, '', blanks)
+    return results
@@ -9,23 +9,245 @@ from typing import Iterable, Iterator  # for type hints
 import itertools  # suggested for permutations() and chain.from_iterable()
 import re  # suggested for finditer()
 import collections
+import hashlib
+import math
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
 
-scrabble_words = set()
-with open('/srv/datasets/scrabble-hybrid') as scrabble_hybrid:
-  for line in scrabble_hybrid:
-    line = line.strip().split()
-    line = list(filter(None, line))
-    # iterating through list to add to set
-    for ele in line:
-      scrabble_words.add(ele)
-  pass
+from dawg import Dawg
 
-letter_values = collections.defaultdict(list)
-with open('/srv/datasets/scrabble-letter-values') as values:
-  for line in values:
-    letter, score = line.split()
-    letter_values[letter] = score
-    pass
+WORDS_PATH = '/srv/datasets/scrabble-hybrid'
+LETTER_VALUES_PATH = '/srv/datasets/scrabble-letter-values'
+SNAPSHOT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'cs20p-scrabble')
+BLANK = '?'
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+CHUNK_SIZE = 1 << 20
+_LETTER_BYTES = (ALPHABET + ALPHABET.lower()).encode()
+_WORD_BYTES = re.compile(rb'[A-Za-z]+')
+
+
+class ScrabbleDictionary:
+  """
+  The legal Scrabble® words and letter values, read from their files only on first use.
+  After the word list is first parsed, it is saved as a snapshot of the words sorted one per line.
+  As long as the snapshot is no older than the word list, later processes memory-map it and answer
+  `word in dictionary` by binary search over the mapped bytes, without parsing anything; the word
+  set itself is only built for operations that need every word.
+  """
+
+  def __init__(self, words_path: str = WORDS_PATH, letter_values_path: str = LETTER_VALUES_PATH,
+               snapshot_path: str = None):
+    self.words_path = words_path
+    self.letter_values_path = letter_values_path
+    if snapshot_path is None:
+      digest = hashlib.sha1(os.path.abspath(words_path).encode()).hexdigest()[:16]
+      snapshot_path = os.path.join(SNAPSHOT_DIR, f'words-{digest}.sorted')
+    self.snapshot_path = snapshot_path
+    self._words = None
+    self._mapped = None
+    self._letter_values = None
+    self._value_table = None
+    self._anagrams = None
+    self._unaries = None
+    self._dawg = None
+    self._scores = None
+
+  def __contains__(self, word: str) -> bool:
+    if self._words is None and self._snapshot():
+      return _contains_line(self._mapped, word.encode())
+    return word in self.words
+
+  @property
+  def words(self) -> frozenset[str]:
+    """ The set of legal words, loaded on first access. """
+    if self._words is None:
+      with open(self.words_path) as scrabble_hybrid:
+        self._words = frozenset(scrabble_hybrid.read().split())
+      if not self._snapshot():
+        self._save_snapshot()
+    return self._words
+
+  @property
+  def letter_values(self) -> dict[str, int]:
+    """ The value of each letter's tile, loaded on first access. """
+    if self._letter_values is None:
+      self._letter_values = {}
+      with open(self.letter_values_path) as values:
+        for line in values:
+          letter, score = line.split()
+          self._letter_values[letter] = int(score)
+    return self._letter_values
+
+  @property
+  def value_table(self) -> bytes:
+    """ A bytes.translate() table from each letter's byte to its value, built on first access. """
+    if self._value_table is None:
+      table = bytearray(256)
+      for letter, score in self.letter_values.items():
+        table[ord(letter)] = score
+      self._value_table = bytes(table)
+    return self._value_table
+
+  @property
+  def scores(self) -> dict[str, int]:
+    """ A table of the score of every legal word, built on first access. """
+    if self._scores is None:
+      table = self.value_table
+      # translate each word's letters into their values, then sum the bytes in C
+      self._scores = {word: sum(word.encode().translate(table)) for word in self.words}
+    return self._scores
+
+  @property
+  def anagrams(self) -> dict[str, list[str]]:
+    """ An index mapping each sorted-letter signature to the legal words spelled with it. """
+    if self._anagrams is None:
+      self._anagrams = collections.defaultdict(list)
+      for word in self.words:
+        self._anagrams[''.join(sorted(word))].append(word)
+      self._anagrams.default_factory = None
+    return self._anagrams
+
+  @property
+  def dawg(self) -> Dawg:
+    """ A DAWG of the legal words, for pattern and hook queries, built on first access. """
+    if self._dawg is None:
+      self._dawg = Dawg(self.words)
+    return self._dawg
+
+  def rack_words(self, tiles: str) -> set[str]:
+    """
+    Returns the set of legal words that could be formed from some of the given tiles, where each
+    BLANK tile may stand for any letter.
+    Without blanks, every distinct sub-multiset of the rack is looked up by its signature, which
+    is 2 ** 15 lookups at most for a 15-tile rack. Where blanks would make that enumeration
+    larger than the index itself, each signature in the index is instead checked against the rack:
+    with letter counts in unary, the letters a signature needs beyond the rack are the bits of its
+    counts not set in the rack's, found with one AND and one bit count.
+    """
+    blanks = tiles.count(BLANK)
+    rack = collections.Counter(tiles.replace(BLANK, ''))
+    letters = sorted(rack)
+    # number of signatures the enumeration would look up
+    lookups = math.prod(rack[letter] + 1 for letter in letters) * math.comb(26 + blanks, blanks)
+    words = set()
+    if lookups <= len(self.anagrams):
+      # build every sorted sub-multiset signature one letter at a time
+      signatures = ['']
+      for letter in letters:
+        signatures = [signature + letter * count
+                      for signature in signatures for count in range(rack[letter] + 1)]
+      if blanks:
+        signatures = {''.join(sorted(signature + ''.join(filled)))
+                      for signature in signatures
+                      for count in range(blanks + 1)
+                      for filled in itertools.combinations_with_replacement(ALPHABET, count)}
+      for signature in signatures:
+        if signature in self.anagrams:
+          words.update(self.anagrams[signature])
+    else:
+      slots, unaries = self._signature_unaries()
+      # the bits of each signature's unary counts that the rack's letters cannot cover
+      uncovered = ~_unary_counts(rack, slots)
+      fits = [signature for unary, signature in unaries
+              if (unary & uncovered).bit_count() <= blanks]
+      words.update(itertools.chain.from_iterable(map(self.anagrams.__getitem__, fits)))
+    return words
+
+  def _signature_unaries(self) -> tuple[dict[str, tuple[int, int]], list[tuple[int, str]]]:
+    """
+    Returns the slots for _unary_counts(), each letter's slot as wide as its largest count in any
+    signature, and each signature in the anagram index paired with its unary counts.
+    """
+    if self._unaries is None:
+      counts = [(collections.Counter(signature), signature) for signature in self.anagrams]
+      widths = {}
+      for letters, _ in counts:
+        for letter, count in letters.items():
+          if count > widths.get(letter, 0):
+            widths[letter] = count
+      slots, shift = {}, 0
+      for letter in sorted(widths):
+        slots[letter] = shift, widths[letter]
+        shift += widths[letter]
+      unaries = []
+      for letters, signature in counts:
+        # no signature's count exceeds its letter's slot, so none needs clamping
+        unary = 0
+        for letter, count in letters.items():
+          unary |= ((1 << count) - 1) << slots[letter][0]
+        unaries.append((unary, signature))
+      self._unaries = slots, unaries
+    return self._unaries
+
+  def _snapshot(self) -> bool:
+    """ Memory-maps the snapshot if it is no older than the word list; returns whether it is. """
+    if self._mapped is None:
+      self._mapped = False
+      try:
+        if os.path.getmtime(self.snapshot_path) >= os.path.getmtime(self.words_path):
+          with open(self.snapshot_path, 'rb') as snapshot:
+            self._mapped = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+      except (OSError, ValueError):
+        # missing, unreadable or empty
+        pass
+    return bool(self._mapped)
+
+  def _save_snapshot(self):
+    """ Writes the words snapshot atomically, silently skipping it if the cache isn't writable. """
+    try:
+      os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+      temporary_path = f'{self.snapshot_path}.{os.getpid()}'
+      with open(temporary_path, 'wb') as snapshot:
+        snapshot.writelines(word.encode() + b'\n' for word in sorted(self._words))
+      os.replace(temporary_path, self.snapshot_path)
+    except OSError:
+      pass
+
+
+def _contains_line(lines: mmap.mmap, key: bytes) -> bool:
+  """
+  Returns whether `key` is one of the lines of sorted, newline-terminated bytes, by binary search
+  over byte offsets: each probe widens to the whole line around the midpoint of the range left.
+  """
+  low, high = 0, len(lines)
+  while low < high:
+    middle = (low + high) // 2
+    start = lines.rfind(b'\n', low, middle) + 1 or low
+    end = lines.find(b'\n', start)
+    line = lines[start:end]
+    if line == key:
+      return True
+    if line < key:
+      low = end + 1
+    else:
+      high = start
+  return False
+
+
+def _unary_counts(counts: collections.Counter, slots: dict[str, tuple[int, int]]) -> int:
+  """
+  Returns letter counts as an integer in which each letter's (shift, width) slot has its lowest
+  `count` bits set, at most `width` of them. Letters without a slot are left out.
+  """
+  unary = 0
+  for letter, count in counts.items():
+    if letter in slots:
+      shift, width = slots[letter]
+      unary |= ((1 << min(count, width)) - 1) << shift
+  return unary
+
+
+dictionary = ScrabbleDictionary()
+
+
+def __getattr__(name):
+  # the original module-level collections, now loaded lazily from the default dictionary
+  if name == 'scrabble_words':
+    return dictionary.words
+  if name == 'letter_values':
+    return dictionary.letter_values
+  raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 def tokenize_words(file: TextIOBase) -> Iterator[str]:
@@ -64,6 +286,7 @@ def legal_words(words: Iterable[str]) -> Iterator[str]:
   >>> list(legal_words(['all', 'in', 'lowercase']))
   []
   """
+  scrabble_words = dictionary.words
   for word in words:
     if word in scrabble_words:
       yield word
@@ -88,13 +311,7 @@ def word_score(word: str) -> int:
   >>> word_score('lowercase')
   0
   """
-  tot_score = 0
-  for c in word:
-    if word in scrabble_words:
-      tot_score += int(letter_values[c])
-    else:
-      return 0
-  return tot_score
+  return dictionary.scores.get(word, 0)
 
 
 def highest_value_word(words: Iterable[str]) -> str:
@@ -115,10 +332,12 @@ def highest_value_word(words: Iterable[str]) -> str:
   ...
   error
   """
+  scores = dictionary.scores
   max_score = 0
   max_word = None
-  for word in legal_words(words):
-    high_score = word_score(word)
+  for word in words:
+    # one lookup per word; illegal words score 0 and so are never selected
+    high_score = scores.get(word, 0)
     if high_score > max_score:
       max_score = high_score
       max_word = word
@@ -130,22 +349,120 @@ def highest_value_word(words: Iterable[str]) -> str:
 def legal_tile_words(tiles: str) -> list[str]:
   """
   Returns a sorted list of all the legal Scrabble® words that could be formed from the "tiles"
-  represented by the argument string.
+  represented by the argument string. A '?' tile is a blank, standing for any letter.
 
   >>> legal_tile_words('JTQHDEZ')
   ['DE', 'ED', 'EDH', 'EH', 'ET', 'ETH', 'HE', 'HET', 'JET', 'TE', 'TED', 'THE', 'ZED']
   """
-  words = set()
-  for length in range(1, len(tiles) + 1):
-    for permutation in itertools.permutations(tiles, length):
-      word = ''.join(permutation)
-      if word in scrabble_words:
-        words.add(word)
-  return sorted(words)
+  return sorted(dictionary.rack_words(tiles))
+
+
+def pattern_words(pattern: str, tiles: str = None) -> list[str]:
+  """
+  Returns a sorted list of the legal Scrabble® words matching a pattern of board letters and '?'
+  squares, e.g. '?A??ER', optionally filling the squares only from the given tiles.
+  """
+  return sorted(dictionary.dawg.match(pattern, tiles))
+
+
+def hook_words(letter: str, tiles: str) -> list[str]:
+  """
+  Returns a sorted list of the legal Scrabble® words that could be played through a letter
+  already on the board using some of the given tiles.
+  """
+  return sorted(dictionary.dawg.hooks(letter, tiles))
+
+
+def _tally(text: bytes, totals: list[int]):
+  """ Adds the number of legal words in a chunk of bytes and their points to [count, points]. """
+  scores = dictionary.scores
+  # look up each distinct word once, however many times it occurs, uppercasing only those
+  for word, occurrences in collections.Counter(_WORD_BYTES.findall(text)).items():
+    score = scores.get(word.upper().decode('ascii'), 0)
+    if score:
+      totals[0] += occurrences
+      totals[1] += score * occurrences
+
+
+def _tally_chunks(chunks: Iterable[bytes]) -> list[int]:
+  """
+  Tallies [count, points] of legal words over a sequence of byte chunks, carrying any run of
+  letters at the end of a chunk over to the next so that no word is split.
+  """
+  totals = [0, 0]
+  carry = b''
+  for chunk in chunks:
+    chunk = carry + chunk
+    cut = len(chunk.rstrip(_LETTER_BYTES))
+    carry = chunk[cut:]
+    _tally(chunk[:cut], totals)
+  _tally(carry, totals)
+  return totals
+
+
+def scan_stream(stream, chunk_size: int = CHUNK_SIZE) -> tuple[int, int]:
+  """
+  Returns the number of legal Scrabble® words in a binary file object (e.g. sys.stdin.buffer) and
+  their total value in points, in a single pass over fixed-size chunks.
+  Words are runs of ASCII letters in either case. Unlike in tokenize_words(), which uppercases
+  text before matching it, a non-ASCII letter such as 'ß' or 'ﬁ' is never folded into ASCII
+  letters, so it ends a word rather than extending it.
+  """
+  return tuple(_tally_chunks(iter(lambda: stream.read(chunk_size), b'')))
+
+
+def _scan_range(path: str, start: int, stop: int) -> list[int]:
+  """
+  Tallies the words starting in bytes [start, stop) of a file, in a worker process.
+  A word straddling either boundary belongs to the range in which it starts.
+  """
+  with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+    def word_boundary(position):
+      while (0 < position < len(mapped) and mapped[position - 1] in _LETTER_BYTES
+             and mapped[position] in _LETTER_BYTES):
+        position += 1
+      return position
+
+    start, stop = word_boundary(start), word_boundary(stop)
+    return _tally_chunks(mapped[position:min(position + CHUNK_SIZE, stop)]
+                         for position in range(start, stop, CHUNK_SIZE))
+
+
+def scan_file(path: str, workers: int = 1) -> tuple[int, int]:
+  """
+  Returns the number of legal Scrabble® words in the file at the given path and their total value
+  in points. With more than one worker (0 or None meaning one per CPU), a file of at least
+  CHUNK_SIZE bytes per worker is split into one byte range per worker process; otherwise it is
+  scanned in this process.
+  """
+  workers = workers or os.cpu_count() or 1
+  size = os.path.getsize(path)
+  if size == 0:
+    return 0, 0
+  if workers == 1 or size < workers * CHUNK_SIZE:
+    return tuple(_scan_range(path, 0, size))
+  # build the score table before forking, so that the workers inherit it instead of each
+  # rebuilding it
+  dictionary.scores
+  bounds = [size * i // workers for i in range(workers + 1)]
+  with ProcessPoolExecutor(max_workers=workers) as executor:
+    results = list(executor.map(_scan_range, [path] * workers, bounds[:-1], bounds[1:]))
+  return sum(count for count, _ in results), sum(points for _, points in results)
 
 
 if __name__ == '__main__':
   # Print the total number of legal words on stdin and their total value in points, just for fun
+  import argparse
   import sys
-  (i1, i2) = itertools.tee(legal_words(tokenize_words(sys.stdin)))
-  print(sum(1 for _ in i1), 'legal Scrabble words worth', sum(map(word_score, i2)), 'points')
+  parser = argparse.ArgumentParser()
+  parser.add_argument('path', nargs='?', help='text file to scan instead of stdin')
+  parser.add_argument('--workers', type=int, default=1,
+                      help='processes to scan the file with (0: one per CPU)')
+  args = parser.parse_args()
+  if args.workers < 0:
+    parser.error('workers must not be negative')
+  if args.path:
+    count, points = scan_file(args.path, args.workers)
+  else:
+    count, points = scan_stream(sys.stdin.buffer)
+  print(count, 'legal Scrabble words worth', points, 'points')
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+""" Module for the ActorWorld class, a vectorised container of many CircleActors. """
+__author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
+
+import struct
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from circle_actor import _EPSILON, CircleActor, _crossing, _replay
+
+# snapshot header: magic, format version, actor count, world width and height, name bytes
+_SNAPSHOT_HEADER = struct.Struct('<4sHxxQddQ')
+_SNAPSHOT_MAGIC = b'ACTW'
+_SNAPSHOT_VERSION = 1
+
+
+def _crossings(positions: np.ndarray, velocities: np.ndarray, radii: np.ndarray, size: float,
+               limit: float) -> np.ndarray:
+  """
+  Vectorised circle_actor._crossing() for one coordinate of many actors. The few coordinates
+  whose wall falls within rounding error of a whole number of steps are settled one at a time.
+  """
+  stepped = positions + velocities
+  now = (stepped - radii < 0) | (stepped + radii > size)
+  speeds = np.abs(velocities)
+  with np.errstate(divide='ignore', invalid='ignore'):
+    counts = np.where(velocities > 0, size - radii - positions, positions - radii) / speeds
+    whole = np.rint(counts)
+    ties = np.abs(counts - whole) * speeds <= (4 * (whole + 1) * _EPSILON
+                                               * (np.abs(positions) + size + speeds))
+    crossings = np.where(speeds > 0, np.floor(counts) + 1, np.inf)
+  crossings[now] = 1
+  for row in np.flatnonzero(ties & ~now & (speeds > 0) & (whole <= limit + 1)).tolist():
+    crossings[row] = _crossing(float(positions[row]), float(velocities[row]),
+                               float(radii[row]), size, limit)
+  return crossings
+
+
+class ActorView(CircleActor):
+  """
+  A CircleActor whose state lives in a row of an ActorWorld's columns, so every CircleActor
+  method reads and writes the world directly.
+  """
+  __slots__ = ('_world', '_index')
+
+  def __init__(self, world: 'ActorWorld', index: int):
+    # CircleActor.__init__ is deliberately not called: the state is already in the world
+    self._world = world
+    self._index = index
+
+  @property
+  def name(self) -> str:
+    return self._world.names[self._index]
+
+  @name.setter
+  def name(self, new_name: str):
+    self._world.names[self._index] = new_name
+
+  @property
+  def world_size(self) -> tuple[float, float]:
+    return self._world.world_size
+
+  @property
+  def _radius(self) -> float:
+    return float(self._world.radii[self._index])
+
+  @_radius.setter
+  def _radius(self, new_radius: float):
+    self._world.radii[self._index] = new_radius
+
+  @property
+  def _position(self) -> tuple[float, float]:
+    x, y = self._world.positions[self._index]
+    return float(x), float(y)
+
+  @_position.setter
+  def _position(self, new_position: tuple[float, float]):
+    self._world.positions[self._index] = new_position
+
+  @property
+  def _velocity(self) -> tuple[float, float]:
+    x, y = self._world.velocities[self._index]
+    return float(x), float(y)
+
+  @_velocity.setter
+  def _velocity(self, new_velocity: tuple[float, float]):
+    self._world.velocities[self._index] = new_velocity
+
+  @property
+  def _x(self) -> float:
+    return float(self._world.positions[self._index, 0])
+
+  @_x.setter
+  def _x(self, new_x: float):
+    self._world.positions[self._index, 0] = new_x
+
+  @property
+  def _y(self) -> float:
+    return float(self._world.positions[self._index, 1])
+
+  @_y.setter
+  def _y(self, new_y: float):
+    self._world.positions[self._index, 1] = new_y
+
+  @property
+  def _vx(self) -> float:
+    return float(self._world.velocities[self._index, 0])
+
+  @_vx.setter
+  def _vx(self, new_vx: float):
+    self._world.velocities[self._index, 0] = new_vx
+
+  @property
+  def _vy(self) -> float:
+    return float(self._world.velocities[self._index, 1])
+
+  @_vy.setter
+  def _vy(self, new_vy: float):
+    self._world.velocities[self._index, 1] = new_vy
+
+
+class ActorWorld:
+  """
+  Holds many circle actors sharing one world size, with their radii, positions and velocities
+  stored as contiguous NumPy columns so that every actor can be stepped at once.
+  Indexing or iterating yields ActorView objects, which behave as CircleActors.
+  """
+
+  def __init__(self, world_size: tuple[float, float], actors: Iterable[CircleActor] = ()):
+    """
+    Constructs a world of the given size, holding copies of the state of the given actors.
+
+    :param world_size: the width and height of the world
+    :param actors: CircleActors to add, whose world sizes must all match
+    """
+    self.world_size = tuple(world_size)
+    self.names = []
+    self._size = 0
+    self._radii = np.empty(0)
+    self._positions = np.empty((0, 2))
+    self._velocities = np.empty((0, 2))
+    for actor in actors:
+      self.add(actor)
+
+  @property
+  def radii(self) -> np.ndarray:
+    """ The radius of every actor, as a view that may be modified in place. """
+    return self._radii[:self._size]
+
+  @property
+  def positions(self) -> np.ndarray:
+    """ The x/y position of every actor, as an n-by-2 view that may be modified in place. """
+    return self._positions[:self._size]
+
+  @property
+  def velocities(self) -> np.ndarray:
+    """ The x/y velocity of every actor, as an n-by-2 view that may be modified in place. """
+    return self._velocities[:self._size]
+
+  def add(self, actor: CircleActor) -> ActorView:
+    """ Appends a copy of the given actor's state to the world and returns its view. """
+    if tuple(actor.world_size) != self.world_size:
+      raise ValueError(f'{actor} lives in a world of size {actor.world_size}, '
+                       f'not {self.world_size}')
+    if self._size == len(self._radii):
+      # grow geometrically so that adding n actors costs O(n) overall
+      capacity = max(16, 2 * self._size)
+      self._radii = np.resize(self._radii, capacity)
+      self._positions = np.resize(self._positions, (capacity, 2))
+      self._velocities = np.resize(self._velocities, (capacity, 2))
+    index = self._size
+    self._size += 1
+    self.names.append(actor.name)
+    self._radii[index] = actor.radius()
+    self._positions[index] = actor.position()
+    self._velocities[index] = actor.velocity()
+    return ActorView(self, index)
+
+  def __len__(self) -> int:
+    return self._size
+
+  def __getitem__(self, index: int) -> ActorView:
+    if not -self._size <= index < self._size:
+      raise IndexError('actor index out of range')
+    return ActorView(self, index % self._size)
+
+  def __iter__(self) -> Iterator[ActorView]:
+    return (ActorView(self, index) for index in range(self._size))
+
+  def snapshot(self) -> bytes:
+    """
+    Returns the whole world as bytes that restore() turns back into an equal world: a fixed
+    header, then the radii, positions and velocities as little-endian float64 columns, the UTF-8
+    length of each name as uint32 and finally the concatenated UTF-8 names.
+    """
+    names = [name.encode('utf-8') for name in self.names]
+    lengths = np.fromiter(map(len, names), dtype='<u4', count=self._size)
+    name_bytes = b''.join(names)
+    header = _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, self._size,
+                                   *self.world_size, len(name_bytes))
+    return b''.join((header,
+                     self.radii.astype('<f8').tobytes(),
+                     self.positions.astype('<f8').tobytes(),
+                     self.velocities.astype('<f8').tobytes(),
+                     lengths.tobytes(),
+                     name_bytes))
+
+  @classmethod
+  def restore(cls, data: bytes) -> 'ActorWorld':
+    """
+    Returns a new world from bytes produced by snapshot(), or from any buffer holding them, such
+    as a memory-mapped file. The numeric columns are copied straight out of the buffer.
+    """
+    data = memoryview(data).cast('B')
+    if len(data) < _SNAPSHOT_HEADER.size:
+      raise ValueError('truncated ActorWorld snapshot')
+    magic, version, size, width, height, name_size = _SNAPSHOT_HEADER.unpack_from(data)
+    if magic != _SNAPSHOT_MAGIC or version != _SNAPSHOT_VERSION:
+      raise ValueError('not an ActorWorld snapshot of a supported version')
+    if len(data) != _SNAPSHOT_HEADER.size + 44 * size + name_size:
+      raise ValueError('ActorWorld snapshot has the wrong length')
+    world = cls((width, height))
+    offset = _SNAPSHOT_HEADER.size
+
+    def column(dtype, count):
+      nonlocal offset
+      values = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+      offset += values.nbytes
+      return values
+
+    world._radii = column('<f8', size).astype(float)
+    world._positions = column('<f8', 2 * size).astype(float).reshape(size, 2)
+    world._velocities = column('<f8', 2 * size).astype(float).reshape(size, 2)
+    ends = np.cumsum(column('<u4', size), dtype=np.int64) + offset
+    starts = np.concatenate(([offset], ends[:-1])).tolist()
+    world.names = [str(data[start:end], 'utf-8') for start, end in zip(starts, ends.tolist())]
+    world._size = size
+    return world
+
+  def save(self, path: str):
+    """ Writes snapshot() to the file at the given path. """
+    with open(path, 'wb') as file:
+      file.write(self.snapshot())
+
+  @classmethod
+  def load(cls, path: str) -> 'ActorWorld':
+    """ Restores a world from a file written by save(). """
+    with open(path, 'rb') as file:
+      return cls.restore(file.read())
+
+  def alive(self) -> np.ndarray:
+    """ Returns a boolean mask of the actors for which bool(actor) would be True. """
+    return (1 <= self.radii) & (self.radii <= min(self.world_size) / 2)
+
+  def step(self):
+    """
+    Moves every actor as CircleActor.step() would, reflecting off the walls of the world.
+    As in step(), an actor leaving through both an x and a y wall in one step is clamped only in
+    y, keeping its stepped x position.
+    """
+    self._step(slice(0, self._size))
+
+  def _step(self, rows):
+    """ step() for only the actors at the given rows, a slice or an array of indices. """
+    radii = self._radii[rows][:, None]
+    positions = self._positions[rows]
+    velocities = self._velocities[rows]
+    size = np.asarray(self.world_size)
+    stepped = positions + velocities
+    # the same tests as CircleActor.step(), so that rounding decides each reflection the same way
+    out = (stepped - radii < 0) | (stepped + radii > size)
+    velocities[out] *= -1
+    clamped = np.maximum(radii, np.minimum(size - radii, stepped))
+    positions[:, 0] = np.where(out[:, 0] & ~out[:, 1], clamped[:, 0], stepped[:, 0])
+    positions[:, 1] = np.where(out[:, 1], clamped[:, 1], stepped[:, 1])
+    self._positions[rows] = positions
+    self._velocities[rows] = velocities
+
+  def advance(self, steps: int, collide: bool = False):
+    """
+    Moves every actor as `steps` calls to step() would, or with `collide`, as `steps` frames of
+    step() followed by collide(). As in CircleActor.advance(), actors jump from one wall reflection
+    to the next, every reflection is the one step() would make, and positions may differ from
+    step()'s in the last few bits.
+    With `collide`, frames are taken in chunks. Only the actors that could take part in a
+    collision during a chunk are stepped and collided frame by frame; all the others jump to the
+    end of the chunk. Chunks grow while few actors are busy and shrink while many are, and while
+    most of the world is busy it is simply stepped and collided frame by frame.
+    """
+    if not collide:
+      self._advance(steps)
+      return
+    horizon, backoff = 16, 1
+    while steps > 0:
+      frames = min(steps, horizon)
+      busy = self._busy_actors(frames)
+      crowded = busy is None or 2 * np.count_nonzero(busy) > self._size
+      if not crowded and self._step_busy(np.flatnonzero(busy), frames):
+        self._advance(frames, np.flatnonzero(~busy))
+        steps -= frames
+        backoff = 1
+        if 8 * np.count_nonzero(busy) <= self._size:
+          horizon = min(2 * horizon, 1024)
+        elif 4 * np.count_nonzero(busy) > self._size:
+          horizon = max(1, horizon // 2)
+        continue
+      # some actor is outside its limits, or too much of the world is busy, so step every actor,
+      # looking for a quieter stretch less and less often
+      frames = min(steps, backoff)
+      for _ in range(frames):
+        self.step()
+        self.collide()
+      steps -= frames
+      backoff = min(2 * backoff, 64)
+      horizon = max(1, horizon // 2)
+
+  def _advance(self, steps: int, rows: np.ndarray = None):
+    """
+    Vectorised CircleActor.advance() for every actor, or for the actors at the given rows: each
+    pass moves every actor with steps left to its next wall reflection, so the number of passes is
+    the largest number of reflections of any actor.
+    """
+    if rows is None:
+      rows = np.arange(self._size)
+    radii = self._radii[rows]
+    size = self.world_size
+    # as in CircleActor.advance(), coordinates known to equal step()'s, plus a number of steps
+    anchors = self._positions[rows]
+    velocities = self._velocities[rows]
+    since = np.zeros_like(anchors)
+    crossings = np.column_stack([_crossings(anchors[:, axis], velocities[:, axis], radii,
+                                            size[axis], steps) for axis in (0, 1)])
+    remaining = np.full(len(rows), float(steps))
+    active = np.flatnonzero(remaining > 0)
+    while active.size:
+      taken = np.minimum(remaining[active], (crossings[active] - since[active]).min(axis=1))
+      since[active] += taken[:, None]
+      remaining[active] -= taken
+      out = since[active] == crossings[active]
+      x_only = active[out[:, 0] & ~out[:, 1]]
+      both = active[out[:, 0] & out[:, 1]]
+      y_out = active[out[:, 1]]
+      for hit, axis in (x_only, 0), (y_out, 1):
+        values = anchors[hit, axis] + since[hit, axis] * velocities[hit, axis]
+        anchors[hit, axis] = np.where(2 * values < size[axis], radii[hit],
+                                      np.maximum(radii[hit], size[axis] - radii[hit]))
+      for row in both.tolist():
+        # step() keeps the stepped, unclamped x, which is only exact as step() rounds it
+        anchors[row, 0] = _replay(float(anchors[row, 0]), float(velocities[row, 0]),
+                                  int(since[row, 0]))
+      for hit, axis in (np.concatenate((x_only, both)), 0), (y_out, 1):
+        velocities[hit, axis] *= -1
+        since[hit, axis] = 0
+        crossings[hit, axis] = _crossings(anchors[hit, axis], velocities[hit, axis], radii[hit],
+                                          size[axis], remaining[hit].max(initial=0))
+      active = active[remaining[active] > 0]
+    self._positions[rows] = anchors + since * velocities
+    self._velocities[rows] = velocities
+
+  def _busy_actors(self, frames: int) -> np.ndarray:
+    """
+    Returns a boolean mask of the actors that could take part in a collision that changes a radius
+    within the next `frames` frames, or None if some actor is outside its wall limits.
+    A busy actor's radius may grow by up to `frames`, and growing can push it off a wall by as
+    much again, so it is kept apart from quiet actors by twice that margin. Quiet actors keep
+    their radii, and an actor moves at most its speed per step while every coordinate is within
+    its wall limits or one step outside them heading back, so two actors cannot overlap before
+    their gap has been closed at their combined speed.
+    """
+    radii = self.radii
+    positions = self.positions
+    velocities = self.velocities
+    low = radii[:, None]
+    high = np.asarray(self.world_size) - low
+    returning = (((positions < low) & (velocities > 0) & (positions + velocities >= low))
+                 | ((positions > high) & (velocities < 0) & (positions + velocities <= high)))
+    settled = np.where(low <= high, ((low <= positions) & (positions <= high)) | returning,
+                       # an actor too large for an axis is clamped to the same coordinate each step
+                       positions == low)
+    if not settled.all():
+      return None
+    busy = np.zeros(self._size, dtype=bool)
+    if self._size < 2:
+      return busy
+    speeds = np.hypot(velocities[:, 0], velocities[:, 1])
+    margin = 2 * frames
+    i, j = self._broad_phase(radii + frames * speeds + margin)
+    offsets = positions[i] - positions[j]
+    # how far apart each candidate pair could still be after `frames` frames
+    apart = np.hypot(offsets[:, 0], offsets[:, 1]) - frames * (speeds[i] + speeds[j])
+    reach = radii[i] + radii[j]
+    changing = (apart < reach) & (radii[i] != radii[j]) & (reach > 0)
+    busy[i[changing]] = busy[j[changing]] = True
+    while True:
+      # a pair with a busy actor may change even with equal radii, once that actor's has changed
+      near = (busy[i] | busy[j]) & (apart < reach + margin * (busy[i].astype(int) + busy[j]))
+      spread = busy.copy()
+      spread[i[near]] = spread[j[near]] = True
+      if np.array_equal(spread, busy):
+        return busy
+      busy = spread
+
+  def _step_busy(self, rows: np.ndarray, frames: int) -> bool:
+    """
+    Steps and collides only the actors at the given rows for `frames` frames, as step() and
+    collide() would if no other actor could reach them. Returns False, restoring them, if some
+    actor's radius grows by more than the margin _busy_actors() keeps around it.
+    """
+    if not rows.size:
+      return True
+    saved = self._radii[rows], self._positions[rows], self._velocities[rows]
+    grown = np.zeros(rows.size)
+    for _ in range(frames):
+      before = self._radii[rows]
+      self._step(rows)
+      cell_size = 2 * float(before.max())
+      if cell_size > 0:
+        self._collide(self._overlapping(*self._grid_pairs(rows, cell_size)))
+      grown += np.maximum(0, self._radii[rows] - before)
+      if (grown > frames).any():
+        self._radii[rows], self._positions[rows], self._velocities[rows] = saved
+        return False
+    return True
+
+  def candidate_pairs(self, cell_size: float = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Broad phase: returns arrays (i, j) of candidate pairs that include every overlapping pair.
+    Actors whose diameter fits in `cell_size` (by default four times the 99th-percentile radius) are
+    binned into a uniform grid, rebuilt on each call by sorting them on cell key, and paired only
+    with actors in the same or neighbouring cells. The few larger actors are checked directly
+    against every other actor, so one giant actor cannot blow up the cell size for all the rest.
+    """
+    return self._broad_phase(self.radii, cell_size)
+
+  def _broad_phase(self, radii: np.ndarray,
+                   cell_size: float = None) -> tuple[np.ndarray, np.ndarray]:
+    """ candidate_pairs() for circles at the actors' positions but with the given radii. """
+    empty = np.empty(0, dtype=np.intp)
+    if self._size < 2:
+      return empty, empty
+    if cell_size is None:
+      cell_size = 4 * float(np.percentile(radii, 99))
+    if cell_size <= 0:
+      cell_size = 2 * float(radii.max())
+      if cell_size <= 0:
+        # no two actors with non-positive radii can overlap
+        return empty, empty
+    large = radii > cell_size / 2
+    first, second = self._grid_pairs(np.flatnonzero(~large), cell_size)
+    firsts, seconds = [first], [second]
+    big = np.flatnonzero(large)
+    for start in range(0, len(big), 256):
+      rows = big[start:start + 256]
+      reach = radii[rows, None] + radii[None, :]
+      offsets = self.positions[rows, None, :] - self.positions[None, :, :]
+      near = np.einsum('ijk,ijk->ij', offsets, offsets) < reach * reach
+      # pairs of two large actors are produced once, by the lower index
+      everyone = np.arange(self._size)
+      near &= (everyone != rows[:, None]) & (~large | (everyone > rows[:, None]))
+      row, partners = np.nonzero(near)
+      firsts.append(rows[row])
+      seconds.append(partners)
+    return np.concatenate(firsts), np.concatenate(seconds)
+
+  def _grid_pairs(self, members: np.ndarray, cell_size: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns arrays (i, j) of every pair among the given actor indices in the same or neighbouring
+    grid cells. Each pair of cells is visited once, via the same cell and four of its eight
+    neighbours.
+    """
+    size = len(members)
+    empty = np.empty(0, dtype=np.intp)
+    if size < 2:
+      return empty, empty
+    cells = np.floor(self.positions[members] / cell_size).astype(np.int64)
+    cells -= cells.min(axis=0)
+    # an empty column on either side keeps x - 1 and x + 1 from wrapping onto a real cell
+    width = int(cells[:, 0].max()) + 2
+    keys = cells[:, 1] * width + cells[:, 0]
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    rank = np.empty(size, dtype=np.intp)
+    rank[order] = np.arange(size)
+    first, second = [empty], [empty]
+    for dx, dy in (0, 0), (1, 0), (-1, 1), (0, 1), (1, 1):
+      neighbours = keys + dy * width + dx
+      low = np.searchsorted(sorted_keys, neighbours, 'left')
+      high = np.searchsorted(sorted_keys, neighbours, 'right')
+      if dx == dy == 0:
+        # within a cell, pair each actor only with those sorted after it
+        low = rank + 1
+      counts = np.maximum(high - low, 0)
+      total = int(counts.sum())
+      if total:
+        starts = np.repeat(low - (np.cumsum(counts) - counts), counts)
+        first.append(members[np.repeat(np.arange(size), counts)])
+        second.append(members[order[starts + np.arange(total)]])
+    return np.concatenate(first), np.concatenate(second)
+
+  def overlapping_pairs(self, cell_size: float = None) -> list[tuple[int, int]]:
+    """
+    Returns every pair (i, j), i < j, of actors that overlap, in ascending order.
+    Candidates come from candidate_pairs(); the narrow phase compares squared distances against
+    squared sums of radii, so no square roots are taken.
+    """
+    return self._overlapping(*self.candidate_pairs(cell_size))
+
+  def _overlapping(self, i: np.ndarray, j: np.ndarray) -> list[tuple[int, int]]:
+    """ The narrow phase of overlapping_pairs(), over the given candidate pairs. """
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    radii = self.radii
+    offsets = self.positions[i] - self.positions[j]
+    reach = radii[i] + radii[j]
+    overlaps = (reach > 0) & (np.einsum('ij,ij->i', offsets, offsets) < reach * reach)
+    i, j = i[overlaps], j[overlaps]
+    order = np.lexsort((j, i))
+    return list(zip(i[order].tolist(), j[order].tolist()))
+
+  def collide(self):
+    """
+    Collides every pair of actors overlapping at the start of the call, in ascending (i, j) order,
+    with the same effect on each pair as CircleActor.collide(). Each pair is re-checked with the
+    radii left by the pairs before it; overlaps that only arise from radii grown during the call
+    are collided on the next call.
+    """
+    self._collide(self.overlapping_pairs())
+
+  def _collide(self, pairs: list[tuple[int, int]]):
+    """ collide() over the given overlapping pairs, in the given order. """
+    if not pairs:
+      return
+    # plain Python floats are much cheaper than NumPy scalars for this sequential loop
+    rows = sorted({index for pair in pairs for index in pair})
+    radii = dict(zip(rows, self._radii[rows].tolist()))
+    positions = dict(zip(rows, self._positions[rows].tolist()))
+    for i, j in pairs:
+      reach = radii[i] + radii[j]
+      dx = positions[i][0] - positions[j][0]
+      dy = positions[i][1] - positions[j][1]
+      if radii[i] != radii[j] and reach > 0 and dx * dx + dy * dy < reach * reach:
+        larger, smaller = (i, j) if radii[i] >= radii[j] else (j, i)
+        radii[larger] += 1
+        radii[smaller] -= 1
+    self._radii[rows] = [radii[row] for row in rows]
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the memory used per actor by a dict-based actor, the slotted CircleActor, an ActorWorld
+and an ActorWorld snapshot, and the time taken to snapshot and restore the world.
+Usage: bench_actor_memory.py [actors]
+"""
+
+__author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
+
+import random
+import sys
+import time
+import tracemalloc
+
+from actor_world import ActorWorld
+from circle_actor import CircleActor
+
+WORLD_SIZE = (8000.0, 6000.0)
+
+
+class DictActor:
+  """ The attribute layout of CircleActor before it was slotted, for comparison. """
+
+  def __init__(self, name, radius, world_size, position, velocity):
+    self.name = name
+    self._radius = radius
+    self._position = position
+    self._velocity = velocity
+    self.world_size = world_size
+
+
+def arguments(count, seed=20):
+  rng = random.Random(seed)
+  return [(f'actor{i}', rng.uniform(2, 10), WORLD_SIZE,
+           (rng.uniform(0, WORLD_SIZE[0]), rng.uniform(0, WORLD_SIZE[1])),
+           (rng.uniform(-3, 3), rng.uniform(-3, 3)))
+          for i in range(count)]
+
+
+def measured(function):
+  """ Returns the result of calling function and the bytes it left allocated. """
+  tracemalloc.start()
+  result = function()
+  allocated, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return result, allocated
+
+
+def timed(function):
+  start = time.perf_counter()
+  result = function()
+  return result, time.perf_counter() - start
+
+
+def main():
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+  # the argument tuples and names are shared by every representation, so are not counted
+  population = arguments(count)
+  _, dict_bytes = measured(lambda: [DictActor(*args) for args in population])
+  actors, slot_bytes = measured(lambda: [CircleActor(*args) for args in population])
+  world, world_bytes = measured(lambda: ActorWorld(WORLD_SIZE, actors))
+  snapshot, snapshot_bytes = measured(world.snapshot)
+  _, snapshot_time = timed(world.snapshot)
+  restored, restore_time = timed(lambda: ActorWorld.restore(snapshot))
+  assert restored.names == world.names and (restored.positions == world.positions).all()
+
+  print(f'{count} actors, bytes per actor:')
+  for label, allocated in (('dict-based actor', dict_bytes), ('slotted CircleActor', slot_bytes),
+                           ('ActorWorld', world_bytes), ('snapshot', snapshot_bytes)):
+    print(f'{label:>20}{allocated / count:10.1f}')
+  print(f'snapshot of {len(snapshot)} bytes taken in {snapshot_time:.4f} s, '
+        f'restored in {restore_time:.4f} s')
+
+  # what remains is the new float objects for the coordinates, which Python cannot update in place
+  _, step_bytes = measured(lambda: [actor.step() for actor in actors])
+  _, step_time = timed(lambda: [actor.step() for actor in actors])
+  print(f'stepping every CircleActor once: {step_time:.4f} s, {step_bytes / count:.1f} bytes per '
+        f'actor left allocated')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmarks advancing CircleActors and ActorWorlds many steps at once against stepping them one
+frame at a time, in a sparse world where collisions are rare, and checks that advancing agrees with
+stepping in a small world where actors with float velocities reflect off the walls constantly.
+Usage: bench_advance.py [steps]
+"""
+
+__author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from actor_world import ActorWorld
+from circle_actor import CircleActor
+
+WORLD_SIZE = (20000.0, 15000.0)
+SMALL_WORLD_SIZE = (100.0, 80.0)
+
+
+def actors(count, seed=21, world_size=WORLD_SIZE, speed=3):
+  rng = random.Random(seed)
+  return [CircleActor(f'actor{i}', rng.uniform(2, 10), world_size,
+                      (rng.uniform(0, world_size[0]), rng.uniform(0, world_size[1])),
+                      (rng.uniform(-speed, speed), rng.uniform(-speed, speed)))
+          for i in range(count)]
+
+
+def timed(function):
+  start = time.perf_counter()
+  result = function()
+  return result, time.perf_counter() - start
+
+
+def main():
+  steps = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+  stepped, advanced = actors(1000), actors(1000)
+  _, step_time = timed(lambda: [actor.step() for actor in stepped for _ in range(steps)])
+  _, advance_time = timed(lambda: [actor.advance(steps) for actor in advanced])
+  print(f'1000 CircleActors, {steps} steps: step() {step_time:.3f} s, '
+        f'advance() {advance_time:.3f} s')
+
+  stepped, advanced = actors(200, 22, SMALL_WORLD_SIZE, 7), actors(200, 22, SMALL_WORLD_SIZE, 7)
+  for actor in stepped:
+    for _ in range(steps):
+      actor.step()
+  for actor in advanced:
+    actor.advance(steps)
+  flipped = sum(a.velocity() != b.velocity() for a, b in zip(stepped, advanced))
+  apart = max(abs(a - b) for pair in zip(stepped, advanced)
+              for a, b in zip(*(actor.position() for actor in pair)))
+  print(f'200 CircleActors in a {SMALL_WORLD_SIZE} world, {steps} steps: '
+        f'{flipped} velocities differ, largest position difference: {apart:.3g}')
+
+  for count in 50, 200, 1000, 3000:
+    population = actors(count)
+    framed, jumped = ActorWorld(WORLD_SIZE, population), ActorWorld(WORLD_SIZE, population)
+    _, frame_time = timed(lambda: [(framed.step(), framed.collide()) for _ in range(steps)])
+    _, jump_time = timed(lambda: jumped.advance(steps, collide=True))
+    print(f'{count}-actor world, {steps} frames: step() and collide() {frame_time:.3f} s, '
+          f'advance(collide=True) {jump_time:.3f} s')
+    print(f'  same radii: {np.array_equal(framed.radii, jumped.radii)}, '
+          f'largest position difference: {np.abs(framed.positions - jumped.positions).max():.3g}')
+
+
+if __name__ == '__main__':
+  main()
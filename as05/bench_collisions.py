@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmarks finding overlapping CircleActors with naive pairwise checks against ActorWorld's
+uniform-grid broad phase, and reports the frame rate of stepping and colliding a 10k-actor world.
+Usage: bench_collisions.py [actors]
+"""
+
+__author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
+
+import random
+import sys
+import time
+
+from actor_world import ActorWorld
+from circle_actor import CircleActor
+
+WORLD_SIZE = (8000.0, 6000.0)
+
+
+def actors(count, seed=19):
+  rng = random.Random(seed)
+  return [CircleActor(f'actor{i}', rng.uniform(2, 10), WORLD_SIZE,
+                      (rng.uniform(0, WORLD_SIZE[0]), rng.uniform(0, WORLD_SIZE[1])),
+                      (rng.uniform(-3, 3), rng.uniform(-3, 3)))
+          for i in range(count)]
+
+
+def naive_pairs(population):
+  return [(i, j) for i, a in enumerate(population) for j in range(i + 1, len(population))
+          if a - population[j] < 0]
+
+
+def timed(function):
+  start = time.perf_counter()
+  result = function()
+  return result, time.perf_counter() - start
+
+
+def main():
+  frame_actors = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+  print(f'{"actors":>8}{"naive (s)":>12}{"grid (s)":>12}{"pairs":>8}')
+  for count in 500, 1000, 2000:
+    population = actors(count)
+    naive, naive_time = timed(lambda: naive_pairs(population))
+    grid, grid_time = timed(lambda: ActorWorld(WORLD_SIZE, population).overlapping_pairs())
+    assert naive == grid
+    print(f'{count:>8}{naive_time:12.4f}{grid_time:12.4f}{len(grid):>8}')
+
+  world = ActorWorld(WORLD_SIZE, actors(frame_actors))
+  frames = 30
+  _, elapsed = timed(lambda: [(world.step(), world.collide()) for _ in range(frames)])
+  print(f'{frame_actors} actors: {frames / elapsed:.1f} frames/s stepping and colliding')
+
+
+if __name__ == '__main__':
+  main()
@@ -3,10 +3,55 @@
 __author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
 
 import math
+import sys
+
+_EPSILON = sys.float_info.epsilon
+
+
+def _crossing(position: float, velocity: float, radius: float, size: float,
+              limit: float = math.inf) -> float:
+  """
+  Returns the number of steps after which step() first reflects a coordinate that starts at
+  `position` and moves by `velocity` per step, for a circle of `radius` in a world `size` wide, or
+  infinity if it never does. The count is computed directly unless the wall falls within rounding
+  error of a whole number of steps, in which case step()'s own additions are replayed to settle
+  it, provided the crossing could come within `limit` steps.
+  """
+  stepped = position + velocity
+  if stepped - radius < 0 or stepped + radius > size:
+    return 1
+  if velocity == 0:
+    return math.inf
+  speed = abs(velocity)
+  count = (size - radius - position if velocity > 0 else position - radius) / speed
+  whole = round(count)
+  tolerance = 4 * (whole + 1) * _EPSILON * (abs(position) + size + speed)
+  if abs(count - whole) * speed > tolerance or whole > limit + 1:
+    return math.floor(count) + 1
+  steps = 1
+  while not (stepped - radius < 0 or stepped + radius > size):
+    stepped += velocity
+    steps += 1
+  return steps
+
+
+def _wall(position: float, radius: float, size: float) -> float:
+  """ Returns where step() clamps a coordinate that has just left the world near `position`. """
+  return radius if 2 * position < size else max(radius, size - radius)
+
+
+def _replay(position: float, velocity: float, steps: int) -> float:
+  """ Returns a coordinate after `steps` additions of `velocity`, rounded as step() rounds it. """
+  for _ in range(steps):
+    position += velocity
+  return position
 
 
 class CircleActor:
   """ Behaves as a circle in a 2D world centered on an X/Y coordinate. """
+  # no per-instance __dict__, and coordinates are separate floats so that step() builds no tuples
+  __slots__ = ('name', 'world_size', '_radius', '_x', '_y', '_vx', '_vy')
+
   def __init__(self, name: str, radius: float, world_size: tuple[float, float],
                position: tuple[float, float], velocity: tuple[float, float]):
     """
@@ -19,10 +64,26 @@ class CircleActor:
     """
     self.name = name
     self._radius = radius
-    self._position = position
-    self._velocity = velocity
+    self._x, self._y = position
+    self._vx, self._vy = velocity
     self.world_size = world_size
 
+  @property
+  def _position(self) -> tuple[float, float]:
+    return self._x, self._y
+
+  @_position.setter
+  def _position(self, new_position: tuple[float, float]):
+    self._x, self._y = new_position
+
+  @property
+  def _velocity(self) -> tuple[float, float]:
+    return self._vx, self._vy
+
+  @_velocity.setter
+  def _velocity(self, new_velocity: tuple[float, float]):
+    self._vx, self._vy = new_velocity
+
   def __bool__(self) -> bool:
     """
     Returns True if this actor is still "alive", meaning its radius is
@@ -59,8 +120,8 @@ class CircleActor:
     i.e. how far the two circles are from touching.
     This value will be negative if the two circles overlap.
     """
-    dx = self._position[0] - other._position[0]
-    dy = self._position[1] - other._position[1]
+    dx = self._x - other._x
+    dy = self._y - other._y
     center_distance = math.sqrt(dx ** 2 + dy ** 2)
     return center_distance - self._radius - other._radius
 
@@ -103,21 +164,63 @@ class CircleActor:
     i.e. one frame of animation or one discrete event.
     e.g. if position is (4, 5) and velocity is (-1, 1), the new position will be (3, 6).
     """
-    new_position = (
-      self._position[0] + self._velocity[0],
-      self._position[1] + self._velocity[1],
-    )
-    self.position(new_position)
-
-    if new_position[0] - self._radius < 0 or new_position[0] + self._radius > self.world_size[0]:
-      self._velocity = (-self._velocity[0], self._velocity[1])
-      self.position((max(self._radius, min(self.world_size[0] - self._radius, new_position[0])),
-                     new_position[1]))
-
-    if new_position[1] - self._radius < 0 or new_position[1] + self._radius > self.world_size[1]:
-      self._velocity = (self._velocity[0], -self._velocity[1])
-      self.position((new_position[0],
-                     max(self._radius, min(self.world_size[1] - self._radius, new_position[1]))))
+    radius = self._radius
+    width, height = self.world_size
+    x = self._x + self._vx
+    y = self._y + self._vy
+    self._x = x
+    self._y = y
+
+    if x - radius < 0 or x + radius > width:
+      self._vx = -self._vx
+      self._x = max(radius, min(width - radius, x))
+
+    if y - radius < 0 or y + radius > height:
+      self._vy = -self._vy
+      # a y reflection puts x back to its stepped, unclamped value
+      self._x = x
+      self._y = max(radius, min(height - radius, y))
+
+  def advance(self, steps: int):
+    """
+    Moves this actor as `steps` calls to step() would.
+    Rather than moving one step at a time, this jumps straight from one wall reflection to the
+    next, so the cost depends on the number of reflections rather than the number of steps.
+    Every reflection, and so the final velocity, is the one step() would make, even when a
+    coordinate lands within rounding error of a wall, as it does on its way back after step() has
+    left it unclamped. The final position may differ from step()'s in the last few bits, since a
+    run of steps is taken as one multiplication rather than many additions.
+    """
+    radius = self._radius
+    width, height = self.world_size
+    # each coordinate is kept as the last value known to equal step()'s, plus a number of steps
+    x, y, vx, vy = self._x, self._y, self._vx, self._vy
+    x_steps = y_steps = 0
+    to_x = _crossing(x, vx, radius, width, steps)
+    to_y = _crossing(y, vy, radius, height, steps)
+    while steps > 0:
+      taken = min(steps, to_x - x_steps, to_y - y_steps)
+      steps -= taken
+      x_steps += taken
+      y_steps += taken
+      if y_steps == to_y:
+        y = _wall(y + y_steps * vy, radius, height)
+        vy = -vy
+        y_steps = 0
+        to_y = _crossing(y, vy, radius, height, steps)
+        if x_steps == to_x:
+          # step() keeps the stepped, unclamped x, which is only exact as step() rounds it
+          x = _replay(x, vx, x_steps)
+          vx = -vx
+          x_steps = 0
+          to_x = _crossing(x, vx, radius, width, steps)
+      elif x_steps == to_x:
+        x = _wall(x + x_steps * vx, radius, width)
+        vx = -vx
+        x_steps = 0
+        to_x = _crossing(x, vx, radius, width, steps)
+    self._x, self._y = x + x_steps * vx, y + y_steps * vy
+    self._vx, self._vy = vx, vy
 
   def velocity(self, new_velocity: tuple[float, float] = None):
     """
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmarks CircularRange's closed-form membership, index and count and its built-in iteration
+against the Python-level defaults inherited from collections.abc.Sequence, and pulling windows of
+indexes out of a ring buffer by indexing against take() and to_array().
+Usage: bench_circular_range.py [length]
+"""
+
+__author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
+
+import collections.abc
+import itertools
+import sys
+import time
+
+from circular_range import CircularRange
+
+Sequence = collections.abc.Sequence
+
+
+def timed(function):
+  start = time.perf_counter()
+  result = function()
+  return result, time.perf_counter() - start
+
+
+def main():
+  length = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+  cr = CircularRange(length * 3, 0, -3)
+  last = cr[-1]
+  # the defaults loop over the infinite cycle, so they only terminate for values that occur;
+  # Sequence.count() never terminates at all
+  comparisons = (
+    ('x in cr', lambda: Sequence.__contains__(cr, last), lambda: last in cr),
+    ('cr.index(x)', lambda: Sequence.index(cr, last), lambda: cr.index(last)),
+    ('iterate 2 cycles', lambda: sum(itertools.islice(Sequence.__iter__(cr), 2 * length)),
+     lambda: sum(itertools.islice(cr, 2 * length))),
+    ('reversed(cr)', lambda: sum(Sequence.__reversed__(cr)), lambda: sum(reversed(cr))),
+  )
+  print(f'CircularRange of {length}: {"default (s)":>12}{"CircularRange (s)":>20}')
+  for label, default, closed in comparisons:
+    expected, default_time = timed(default)
+    result, closed_time = timed(closed)
+    assert result == expected
+    print(f'{label:>24}{default_time:12.4f}{closed_time:20.6f}')
+  _, count_time = timed(lambda: cr.count(last))
+  print(f'{"cr.count(x)":>24}{"never ends":>12}{count_time:20.6f}')
+
+  ring = CircularRange(0, 4096)
+  size, windows = 10000, 200
+  starts = range(0, windows * 997, 997)
+  print(f'{windows} windows of {size} indexes:')
+  indexed, indexed_time = timed(lambda: [[ring[i] for i in range(start, start + size)]
+                                         for start in starts])
+  taken, take_time = timed(lambda: [list(ring.take(size, start)) for start in starts])
+  ring.to_array(0, 1)  # import NumPy before timing
+  arrays, array_time = timed(lambda: [ring.to_array(start, size) for start in starts])
+  assert indexed == taken == [array.tolist() for array in arrays]
+  for label, elapsed in (('indexing', indexed_time), ('take()', take_time),
+                         ('to_array()', array_time)):
+    print(f'{label:>24}{elapsed:12.4f}')
+
+
+if __name__ == '__main__':
+  main()
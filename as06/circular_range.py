@@ -5,6 +5,7 @@
 __author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
 
 import collections.abc
+import itertools
 
 
 class CircularRange(collections.abc.Sequence):
@@ -54,9 +55,125 @@ class CircularRange(collections.abc.Sequence):
     return self.range_length
 
   def __contains__(self, item):
-    if item < self.start or item >= self.stop:
-      return False
-    return (item - self.start) % self.step == 0
+    return self._offset(item) is not None
+
+  def __iter__(self):
+    """ Cycles through the range forever, as indexing from 0 upward would. """
+    if not self.range_length:
+      return iter(())
+    return itertools.chain.from_iterable(itertools.repeat(self._one_cycle()))
+
+  def __reversed__(self):
+    """ Iterates once through the range backward, from index len(self) - 1 down to index 0. """
+    return reversed(self._one_cycle())
+
+  def index(self, value, start=0, stop=None):
+    """
+    Returns the first index i, start <= i < stop, at which self[i] == value. As the range cycles
+    forever, stop may be omitted even if value is absent, and i may be len(self) or more.
+    Raises ValueError if there is no such index.
+    """
+    offset = self._offset(value)
+    if start < 0:
+      start = max(len(self) + start, 0)
+    if stop is not None and stop < 0:
+      stop += len(self)
+    if offset is not None:
+      index = start + (offset - start) % self.range_length
+      if stop is None or index < stop:
+        return index
+    raise ValueError(f'{value!r} is not in {self!r}')
+
+  def count(self, value):
+    """ Returns the number of occurrences of value in one cycle of the range: 0 or 1. """
+    return int(value in self)
+
+  def window(self, start, length):
+    """
+    Returns a lazily evaluated view of the `length` elements self[start] through
+    self[start + length - 1], which computes each element only when it is accessed.
+    """
+    return CircularWindow(self, start, length)
+
+  def take(self, n, start=0):
+    """
+    Returns an iterator over the `n` elements from self[start] onward, wrapping around the range
+    as often as needed. The wrapping is done by chaining built-in ranges, not per element.
+    """
+    if n <= 0:
+      return iter(())
+    if not self.range_length:
+      raise IndexError('cannot take elements of an empty CircularRange')
+    cycle = self._one_cycle()
+    first = cycle[start % self.range_length:]
+    return itertools.islice(
+      itertools.chain(first, itertools.chain.from_iterable(itertools.repeat(cycle))), n)
+
+  def to_array(self, start=0, length=None):
+    """
+    Returns a NumPy array of the `length` elements (len(self) if omitted) from self[start]
+    onward, wrapping around the range, computed in one vectorised operation. Requires NumPy.
+    """
+    import numpy as np
+    if length is None:
+      length = self.range_length
+    if length and not self.range_length:
+      raise IndexError('cannot take elements of an empty CircularRange')
+    indexes = np.arange(start, start + length, dtype=np.int64)
+    if length:
+      indexes %= self.range_length
+    return self.start + indexes * self.step
+
+  def _one_cycle(self):
+    """ Returns the built-in range of self[0] through self[len(self) - 1]. """
+    return range(self.start, self.start + self.range_length * self.step, self.step)
+
+  def _offset(self, item):
+    """ Returns the index of item within one cycle of the range, or None if it never appears. """
+    try:
+      quotient, remainder = divmod(item - self.start, self.step)
+    except TypeError:
+      return None
+    if remainder or not 0 <= quotient < self.range_length:
+      return None
+    return int(quotient)
 
   def __repr__(self):
     return f'CircularRange({self.start}, {self.stop}, {self.step})'
+
+
+class CircularWindow(collections.abc.Sequence):
+  """
+  A finite, lazily evaluated view of a CircularRange: element i is
+  source[start + i * stride], for 0 <= i < length. Slicing a window returns another window.
+  """
+
+  def __init__(self, source, start, length, stride=1):
+    """Constructs a view of `length` elements of source, stride apart, from source[start]."""
+    self.source = source
+    self.start = start
+    self.length = max(length, 0)
+    self.stride = stride
+
+  def __getitem__(self, index):
+    if isinstance(index, slice):
+      indexes = range(self.length)[index]
+      return CircularWindow(self.source, self.start + indexes.start * self.stride, len(indexes),
+                            self.stride * indexes.step)
+    if index < 0:
+      index += self.length
+    if not 0 <= index < self.length:
+      raise IndexError('CircularWindow index out of range')
+    return self.source[self.start + index * self.stride]
+
+  def __len__(self):
+    return self.length
+
+  def __iter__(self):
+    if self.stride == 1:
+      return self.source.take(self.length, self.start)
+    return map(self.source.__getitem__,
+               range(self.start, self.start + self.length * self.stride, self.stride))
+
+  def __repr__(self):
+    return f'CircularWindow({self.source!r}, {self.start}, {self.length}, {self.stride})'
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the trie-pruned word search against the original bisect-per-extension search on a
+small grid, times the trie search alone on a large one, and times WordSearchSolver start-up from
+the dictionary text against start-up from its cached trie.
+Usage: bench_word_search.py [dictionary path] [grid size]
+Without a dictionary path (or given '-'), a random dictionary is generated with English-like letter
+frequencies.
+"""
+
+__author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
+
+import os
+import random
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+
+from cs20p_word_search import WordSearchSolver, build_trie, find_words, load_dictionary
+
+# English letter frequencies, roughly, in occurrences per 1000 letters
+FREQUENCIES = {'E': 127, 'T': 91, 'A': 82, 'O': 75, 'I': 70, 'N': 67, 'S': 63, 'H': 61, 'R': 60,
+               'D': 43, 'L': 40, 'C': 28, 'U': 28, 'M': 24, 'W': 24, 'F': 22, 'G': 20, 'Y': 20,
+               'P': 19, 'B': 15, 'V': 10, 'K': 8, 'J': 2, 'X': 2, 'Q': 1, 'Z': 1}
+MIN_LENGTH = 3
+
+
+def random_letters(rng, count):
+  return rng.choices(list(FREQUENCIES), weights=list(FREQUENCIES.values()), k=count)
+
+
+def binary_search(dictionary, word):
+  """ Returns whether a word is in the sorted dictionary, as the original search looked it up. """
+  pos = bisect_left(dictionary, word)
+  return (pos != len(dictionary)) and (dictionary[pos] == word)
+
+
+def bisect_search(grid, len_min, dictionary):
+  """ The original search: every ray to the edge of the grid, one binary search per letter. """
+  found_words = set()
+  for row in range(len(grid)):
+    for col in range(len(grid[0])):
+      for dr, dc in (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1):
+        word = []
+        r, c = row, col
+        while 0 <= r < len(grid) and 0 <= c < len(grid[0]):
+          word.append(grid[r][c])
+          if len(word) >= len_min and binary_search(dictionary, ''.join(word)):
+            found_words.add(''.join(word))
+          r += dr
+          c += dc
+  return found_words
+
+
+def timed(function):
+  start = time.perf_counter()
+  result = function()
+  return result, time.perf_counter() - start
+
+
+def main():
+  rng = random.Random(24)
+  if len(sys.argv) > 1 and sys.argv[1] != '-':
+    dictionary = load_dictionary(sys.argv[1], MIN_LENGTH)
+  else:
+    dictionary = sorted({''.join(random_letters(rng, rng.randint(MIN_LENGTH, 10)))
+                         for _ in range(200000)})
+  size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+  trie, trie_time = timed(lambda: build_trie(dictionary, MIN_LENGTH))
+  print(f'{len(dictionary)} words, trie built in {trie_time:.3f} s')
+
+  small = [random_letters(rng, 60) for _ in range(60)]
+  expected, bisect_time = timed(lambda: bisect_search(small, MIN_LENGTH, dictionary))
+  found, find_time = timed(lambda: find_words(small, trie))
+  assert found == expected
+  print(f'60x60 grid: bisect {bisect_time:.3f} s, trie {find_time:.3f} s, {len(found)} words')
+
+  large = [random_letters(rng, size) for _ in range(size)]
+  found, find_time = timed(lambda: find_words(large, trie))
+  print(f'{size}x{size} grid: trie {find_time:.3f} s, {len(found)} words')
+
+  with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'dictionary')
+    with open(path, 'w') as file:
+      file.write('\n'.join(dictionary))
+    _, text_time = timed(lambda: WordSearchSolver(path, MIN_LENGTH).trie)
+    _, cache_time = timed(lambda: WordSearchSolver(path, MIN_LENGTH).trie)
+  print(f'solver start-up: from text {text_time:.3f} s, from cache {cache_time:.3f} s')
+
+
+if __name__ == '__main__':
+  main()
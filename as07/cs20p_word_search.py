@@ -3,17 +3,39 @@
 """ word search to re-traumatize me from my time in school """
 
 __author__ = 'Anthony Torres for CS 20P, altorresmoran@jeff.cis.cabrillo.edu'
+import gc
+import os
+import pickle
 import sys
-from bisect import bisect_left
 
+# key marking the end of a word in a trie node, mapping to the word itself
+WORD = ''
+# fills the border around a flattened grid; no word contains it, so it ends every ray
+SEPARATOR = '\n'
 
-def read_grid():
+
+def read_grids(stream):
   """
-  Reads word search grid from stdin and returns
-  a list of lists containing the characters.
+  Yields each grid in a text stream holding one or more grids separated by blank lines, as a list
+  of lists containing the characters.
   """
-  grid = [list(line.strip()) for line in sys.stdin]
-  return grid
+  grid = []
+  for line in stream:
+    line = line.strip()
+    if line:
+      grid.append(list(line))
+    elif grid:
+      yield grid
+      grid = []
+  if grid:
+    yield grid
+
+
+def read_grid_files(paths):
+  """ Yields every grid in each of the files at the given paths in turn, as read_grids() does. """
+  for path in paths:
+    with open(path) as file:
+      yield from read_grids(file)
 
 
 def load_dictionary(dictionary_file, length_min):
@@ -26,59 +48,145 @@ def load_dictionary(dictionary_file, length_min):
   return dictionary
 
 
-def binary_search(dictionary, word):
+def build_trie(words, length_min=1):
   """
-  Performs a binary search in the dictionary to check if
-  a given word is present.
+  Builds a trie of the words at least length_min long: nested dicts mapping each letter to the
+  node for the prefix extended by it, where the WORD key of a node holds the word ending there.
   """
-  # using bisect_left to perform a binary search on
-  pos = bisect_left(dictionary, word)
-  return (pos != len(dictionary)) and (dictionary[pos] == word)
+  trie = {}
+  for word in words:
+    if len(word) >= length_min:
+      node = trie
+      for letter in word:
+        node = node.setdefault(letter, {})
+      node[WORD] = word
+  return trie
 
 
-def find_valid_word(grid, len_min, dictionary):
+def find_words(grid, trie):
   """
-  Searches for valid words in the grid using the dictionary and
-  iterates through each cell in the grid ala 'Espejeando by Los Tucanes De Tijuana' plus
-  diagonally. Uses binary search function to verify if word is in dict and adds to found_words set.
+  Returns the set of words in the trie that read along a straight line in any of the 8 directions
+  through the grid. The grid is flattened into one string, ringed by SEPARATORs, so every
+  direction is a fixed stride through it. Each ray is walked down the trie and stops at the first
+  prefix no word starts with, or at the edge of the grid.
   """
-  directions = [(0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1)]
+  width = max(map(len, grid), default=0)
+  if not width:
+    return set()
+  stride = width + 1
+  rows = ''.join(''.join(row).ljust(width, SEPARATOR) + SEPARATOR for row in grid)
+  flat = SEPARATOR * (stride + 1) + rows + SEPARATOR * (stride + 1)
+  strides = (1, stride + 1, stride, stride - 1, -1, -stride - 1, -stride, -stride + 1)
   found_words = set()
-  for row in range(len(grid)):
-    for col in range(len(grid[0])):
-      for dr, dc in directions:
-        word = []
-        r, c = row, col
-        # loop to check if current row (r and c) are within
-        # grids boundaries
-        while 0 <= r < len(grid) and 0 <= c < len(grid[0]):
-          word.append(grid[r][c])
-          # check if length of word is greater or equal to min length and
-          # if word in dict using binary search.
-          # if word is valid, adds to set
-          if len(word) >= len_min and binary_search(dictionary, ''.join(word)):
-            found_words.add(''.join(word))
-          # update current row and column
-          r += dr
-          c += dc
+  for position in range(stride + 1, len(flat) - stride - 1):
+    first = trie.get(flat[position])
+    if first is None:
+      continue
+    if WORD in first:
+      found_words.add(first[WORD])
+    for step in strides:
+      node = first.get(flat[position + step])
+      ahead = position + 2 * step
+      while node is not None:
+        if WORD in node:
+          found_words.add(node[WORD])
+        node = node.get(flat[ahead])
+        ahead += step
   return found_words
 
 
-def main():
-  grid = read_grid()
-  dictionary = load_dictionary(dict_file, min_length)
-  valid_words = find_valid_word(grid, min_length, dictionary)
+def find_valid_word(grid, len_min, dictionary):
+  """
+  Searches for valid words of at least len_min letters in the grid, reading from each cell in all
+  8 directions ala 'Espejeando by Los Tucanes De Tijuana' plus diagonally. The dictionary is
+  loaded into a trie so that each direction is abandoned as soon as no word has its prefix.
+  """
+  return find_words(grid, build_trie(dictionary, len_min))
+
+
+class WordSearchSolver:
+  """
+  Finds the words of a dictionary in any number of word search grids, loading the dictionary into
+  a trie only on first use. The trie is then cached as a pickle next to the dictionary, which
+  later solvers load instead of re-reading the dictionary, as long as the cache is no older than
+  the dictionary.
+  """
 
-  for word in sorted(valid_words):
-    print(word)
+  def __init__(self, dictionary_path, min_length=1, cache_path=None):
+    self.dictionary_path = dictionary_path
+    self.min_length = min_length
+    self.cache_path = cache_path or f'{dictionary_path}.min{min_length}.trie'
+    self._trie = None
+
+  @property
+  def trie(self):
+    """ The trie of dictionary words at least min_length long, loaded on first access. """
+    if self._trie is None:
+      # the trie is a million or so small dicts; collecting garbage while creating them only
+      # repeatedly re-scans them, more than doubling the time taken
+      collecting = gc.isenabled()
+      gc.disable()
+      try:
+        self._trie = self._load_cache()
+        if self._trie is None:
+          self._trie = build_trie(load_dictionary(self.dictionary_path, self.min_length),
+                                  self.min_length)
+          self._save_cache()
+      finally:
+        if collecting:
+          gc.enable()
+    return self._trie
+
+  def solve(self, grid):
+    """ Returns the set of dictionary words found in the grid, as find_valid_word() does. """
+    return find_words(grid, self.trie)
+
+  def solve_all(self, grids):
+    """ Yields the set of dictionary words found in each of the grids in turn. """
+    for grid in grids:
+      yield self.solve(grid)
+
+  def _load_cache(self):
+    """ Returns the trie from a cache at least as new as the dictionary, or None. """
+    try:
+      if os.path.getmtime(self.cache_path) < os.path.getmtime(self.dictionary_path):
+        return None
+      with open(self.cache_path, 'rb') as cache:
+        return pickle.load(cache)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+      return None
+
+  def _save_cache(self):
+    """ Writes the trie cache atomically, silently skipping it if the directory isn't writable. """
+    try:
+      temporary_path = f'{self.cache_path}.{os.getpid()}'
+      with open(temporary_path, 'wb') as cache:
+        pickle.dump(self._trie, cache, pickle.HIGHEST_PROTOCOL)
+      os.replace(temporary_path, self.cache_path)
+    except OSError:
+      pass
+
+
+def main(min_length, dict_file, grid_files=()):
+  """
+  Prints the sorted words found in each grid, read from the given files or else from stdin, with
+  grids separated by blank lines and a blank line between the words of successive grids.
+  """
+  solver = WordSearchSolver(dict_file, min_length)
+  if grid_files:
+    grids = read_grid_files(grid_files)
+  else:
+    grids = read_grids(sys.stdin)
+  for number, valid_words in enumerate(solver.solve_all(grids)):
+    if number:
+      print()
+    for word in sorted(valid_words):
+      print(word)
 
 
 if __name__ == '__main__':
-  if len(sys.argv) != 3:
+  if len(sys.argv) < 3:
     print('Why are you wasting electricity')
     sys.exit(1)
 
-  min_length = int(sys.argv[1])
-  dict_file = sys.argv[2]
-
-  main()
+  main(int(sys.argv[1]), sys.argv[2], sys.argv[3:])